@@ -35,6 +35,22 @@ module.exports = {
     userDataDir: userDataDir, // Store cookies and session data here
   },
   
+  // Python worker settings
+  python: {
+    logLevel: process.env.PYTHON_LOG_LEVEL || 'info', // debug, info, warning or error
+    // Browser memory limits enforced by the worker's resource governor (MB)
+    memory: {
+      tabRecycleHeapMb: parseInt(process.env.BROWSER_TAB_RECYCLE_HEAP_MB) || 512,
+      maxHeapMb: parseInt(process.env.BROWSER_MAX_HEAP_MB) || 1024,
+      maxRssMb: parseInt(process.env.BROWSER_MAX_RSS_MB) || 3072,
+    },
+    // Compressed archive of search and profile page sources (disabled unless a directory is set)
+    archive: {
+      archiveDir: process.env.SNAPSHOT_ARCHIVE_DIR ? path.resolve(process.env.SNAPSHOT_ARCHIVE_DIR) : undefined,
+      archiveMaxMb: parseInt(process.env.SNAPSHOT_ARCHIVE_MAX_MB) || 512,
+    },
+  },
+  
   // Server settings
   server: {
     port: process.env.PORT || 3000,
@@ -0,0 +1,413 @@
+#!/usr/bin/env python
+"""
+Sharded crawl coordinator.
+
+Spreads a large list of search queries and profile URLs across several
+configured accounts. Each account is one shard with its own Chrome profile
+directory (its session snapshot) and its own profile index, and runs
+linkedin_scraper_script.py worker processes one at a time. Profile URLs are
+placed on a consistent hash ring by their canonical key, so enrichment of a
+given person always lands on the same shard's cache, and shards that lose
+their session hand their remaining work to the next shard on the ring.
+Results from all shards are merged into one stream of item frames (see
+ipc.py) and, optionally, a JSONL file.
+
+Run it like the worker, with a JSON config on stdin:
+
+    {
+      "accounts": [{"id": "a1", "email": "...", "password": "...",
+                    "userDataDir": "optional", "command": ["optional", "argv"]}],
+      "queries": [{"keywords": "vp sales", "location": "Germany"}],
+      "profiles": ["https://www.linkedin.com/in/..."],
+      "enrich": true,
+      "batchSize": 20,
+      "dataDir": "../data/shards",
+      "output": "optional.jsonl",
+      "postProcess": {"workers": 4, "chunkSize": 100, "score": true, "csv": "optional.csv"},
+      "workerArgs": {"headless": true, "baseUrl": "http://localhost:8080"}
+    }
+
+``command`` replaces the local worker invocation (for example with an ssh
+wrapper running on another node); ``workerArgs.baseUrl`` points the workers at
+a stand-in server for local testing (tests/stand_in_server.py; profile pages are
+fetched from baseUrl too). With ``postProcess`` the merged stream
+runs through post_processing.Pipeline while the crawl continues, and ``output``
+receives the processed records.
+"""
+import bisect
+import hashlib
+import json
+import os
+import queue
+import subprocess
+import sys
+import threading
+
+import ipc
+import scrape_errors
+from post_processing import Pipeline
+from profile_index import canonical_profile_url, profile_key
+
+WORKER_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "linkedin_scraper_script.py")
+
+# Worker failures that mean the shard's session is unusable
+SHARD_FATAL_CLASSES = (scrape_errors.AUTH_LOST, scrape_errors.CHECKPOINT)
+
+
+def _hash(value):
+    return int(hashlib.md5(value.encode("utf-8")).hexdigest()[:16], 16)
+
+
+class HashRing:
+    """Consistent hash ring with virtual nodes."""
+
+    def __init__(self, nodes, replicas=100):
+        self.replicas = replicas
+        self._ring = sorted((_hash(f"{node}#{i}"), node) for node in nodes for i in range(replicas))
+        self._hashes = [h for h, _ in self._ring]
+
+    def node_for(self, key, exclude=()):
+        """Return the node owning key, skipping excluded nodes; None if every node is excluded."""
+        if not self._ring:
+            return None
+        start = bisect.bisect(self._hashes, _hash(key)) % len(self._ring)
+        seen = set()
+        for offset in range(len(self._ring)):
+            node = self._ring[(start + offset) % len(self._ring)][1]
+            if node in exclude or node in seen:
+                seen.add(node)
+                continue
+            return node
+        return None
+
+
+class Shard:
+    """One account: its session directory, profile index and worker invocation."""
+
+    def __init__(self, account, data_dir, worker_args):
+        self.id = str(account["id"])
+        self.email = account.get("email", "")
+        self.password = account.get("password", "")
+        shard_dir = os.path.join(data_dir, self.id)
+        self.user_data_dir = account.get("userDataDir") or os.path.join(shard_dir, "user_data")
+        self.profile_index_path = os.path.join(shard_dir, "profile_index.db")
+        self.facet_lookup_path = os.path.join(data_dir, "facet_urns.json")
+        self.command = account.get("command") or [sys.executable, "-u", WORKER_SCRIPT]
+        self.worker_args = worker_args
+        self.down = None
+        self.jobs = 0
+
+    def run(self, args, on_frame=None):
+        """Run one worker process and return its reassembled result."""
+        payload = dict(
+            self.worker_args,
+            email=self.email,
+            password=self.password,
+            userDataDir=self.user_data_dir,
+            profileIndexPath=self.profile_index_path,
+            facetLookupPath=self.facet_lookup_path,
+            **args
+        )
+        self.jobs += 1
+        process = subprocess.Popen(self.command, stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+                                   stderr=sys.stderr, text=True, encoding="utf-8")
+        process.stdin.write(json.dumps(payload))
+        process.stdin.close()
+
+        result = None
+        streamed = {}
+        with process.stdout:
+            for line in process.stdout:
+                try:
+                    frame = json.loads(line)
+                except ValueError:
+                    continue
+                msg_type, data = frame.get("type"), frame.get("data")
+                if msg_type == "item":
+                    streamed.setdefault(data["collection"], []).append(data["record"])
+                elif msg_type == "result":
+                    result = data
+                elif on_frame:
+                    on_frame(msg_type, data)
+        process.wait()
+
+        if result is None:
+            return {"success": False, "error": f"Worker exited with code {process.returncode} without a result",
+                    "errorClass": scrape_errors.DRIVER_CRASH}
+        result.pop("streamed", None)
+        result.update(streamed)
+        return result
+
+
+class CrawlCoordinator:
+    """Routes search and enrichment jobs to shards and merges their results."""
+
+    def __init__(self, accounts, data_dir, worker_args=None, batch_size=20):
+        if not accounts:
+            raise ValueError("At least one account is required")
+        self.shards = {}
+        for account in accounts:
+            shard = Shard(account, data_dir, worker_args or {})
+            self.shards[shard.id] = shard
+        self.ring = HashRing(list(self.shards))
+        self.batch_size = max(1, int(batch_size))
+        self._output = queue.Queue()
+        self._seen = set()
+        self._seen_lock = threading.Lock()
+        self.stats = {"searches": 0, "enriched": 0, "duplicates": 0, "rerouted": 0, "failedJobs": 0}
+        self._stats_lock = threading.Lock()
+
+    def _count(self, stat):
+        """Increment a stats counter; shard threads update them concurrently."""
+        with self._stats_lock:
+            self.stats[stat] += 1
+
+    def _down_shards(self):
+        return {shard_id for shard_id, shard in self.shards.items() if shard.down}
+
+    def _forward(self, shard):
+        """Relay worker log/progress/metric frames tagged with the shard id."""
+        def forward(msg_type, data):
+            if ipc.channel is None:
+                return
+            if isinstance(data, dict):
+                data = dict(data, shard=shard.id)
+            ipc.channel.send(msg_type, data)
+        return forward
+
+    @staticmethod
+    def _fatal_class(result):
+        """
+        Return the shard-fatal error class a worker result reports, if any.
+        Enrichment keeps success=True when the breaker stops it (or when only the
+        last profile failed), so per-profile detailsError values are checked too.
+        """
+        if result.get("errorClass") in SHARD_FATAL_CLASSES:
+            return result["errorClass"]
+        for profile in result.get("profiles") or []:
+            if profile.get("detailsError") in SHARD_FATAL_CLASSES:
+                return profile["detailsError"]
+        return None
+
+    def _mark_failure(self, shard, result):
+        """Count a failed or degraded job; take the shard out of rotation if its session is gone."""
+        error_class = self._fatal_class(result)
+        self._count("failedJobs")
+        if error_class:
+            shard.down = error_class
+            if ipc.channel is not None:
+                ipc.channel.log(f"Shard {shard.id} taken out of rotation: {error_class}", "warning")
+
+    def _run_shards(self, jobs_by_shard, run_job, on_unroutable=None):
+        """
+        Run each shard's job list on its own thread (one worker process per
+        shard at a time, since a Chrome profile directory cannot be shared).
+        run_job returns False when the job failed because its shard went down;
+        that job and the rest of the shard's list are rerouted along the ring
+        until every job has run or no healthy shard is left.
+        """
+        while jobs_by_shard:
+            leftovers = []
+            leftovers_lock = threading.Lock()
+
+            def worker(shard, jobs):
+                for index, job in enumerate(jobs):
+                    handled = not shard.down and run_job(shard, job) is not False
+                    if shard.down:
+                        with leftovers_lock:
+                            leftovers.extend(jobs[index + 1 if handled else index:])
+                        return
+
+            threads = [threading.Thread(target=worker, args=(self.shards[shard_id], jobs), daemon=True)
+                       for shard_id, jobs in jobs_by_shard.items() if jobs]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+            jobs_by_shard = {}
+            for job in leftovers:
+                shard_id = self.ring.node_for(job["routingKey"], exclude=self._down_shards())
+                if shard_id is None:
+                    self._count("failedJobs")
+                    if on_unroutable:
+                        on_unroutable(job)
+                    continue
+                self._count("rerouted")
+                jobs_by_shard.setdefault(shard_id, []).append(job)
+
+    def login_all(self):
+        """Log every shard in once; shards that fail are taken out of rotation."""
+        def run_job(shard, job):
+            result = shard.run({"action": "login"}, self._forward(shard))
+            if not result.get("success"):
+                shard.down = result.get("errorClass") or scrape_errors.AUTH_LOST
+        self._run_shards({shard_id: [{"routingKey": shard_id}] for shard_id in self.shards}, run_job)
+
+    def _emit(self, profile):
+        """Queue a profile for the merged output unless the person was already emitted."""
+        key = profile_key(profile.get("profileUrl")) or profile.get("profileUrl")
+        with self._seen_lock:
+            duplicate = key in self._seen
+            self._seen.add(key)
+        if duplicate:
+            self._count("duplicates")
+            return
+        self._output.put(profile)
+
+    def crawl(self, queries=(), profiles=(), enrich=True):
+        """
+        Run all queries, then enrich every discovered profile on its owning
+        shard. Yields merged, deduplicated profile records as they complete.
+        """
+        done = threading.Event()
+        error = []
+
+        def run():
+            try:
+                self._crawl(queries, profiles, enrich)
+            except Exception as e:
+                error.append(e)
+            finally:
+                done.set()
+
+        threading.Thread(target=run, daemon=True).start()
+        while not (done.is_set() and self._output.empty()):
+            try:
+                yield self._output.get(timeout=0.2)
+            except queue.Empty:
+                continue
+        if error:
+            raise error[0]
+
+    def _crawl(self, queries, profiles, enrich):
+        discovered = {}
+        discovered_lock = threading.Lock()
+
+        def run_search(shard, job):
+            args = dict(job["query"], action="search", skipLogin=True, getDetailedInfo=False)
+            result = shard.run(args, self._forward(shard))
+            self._count("searches")
+            if not result.get("success") or self._fatal_class(result):
+                self._mark_failure(shard, result)
+                return not shard.down
+            for profile in result.get("profiles", []):
+                profile["shard"] = shard.id
+                if enrich:
+                    with discovered_lock:
+                        discovered.setdefault(profile_key(profile["profileUrl"]), profile)
+                else:
+                    self._emit(profile)
+
+        search_jobs = {}
+        for query in queries:
+            routing_key = json.dumps(query, sort_keys=True)
+            shard_id = self.ring.node_for(routing_key, exclude=self._down_shards())
+            if shard_id is None:
+                break
+            search_jobs.setdefault(shard_id, []).append({"routingKey": routing_key, "query": query})
+        self._run_shards(search_jobs, run_search)
+
+        if not enrich and not profiles:
+            return
+        for url in profiles:
+            key = profile_key(url)
+            if key:
+                discovered.setdefault(key, {"name": "Unknown", "profileUrl": canonical_profile_url(url),
+                                            "title": "", "location": ""})
+
+        def run_enrich(shard, job):
+            result = shard.run({"action": "enrich", "skipLogin": True,
+                                "profileUrls": [p["profileUrl"] for p in job["profiles"]]}, self._forward(shard))
+            if not result.get("success") or self._fatal_class(result):
+                self._mark_failure(shard, result)
+            enriched = {profile_key(p["profileUrl"]): p for p in result.get("profiles", [])}
+            remaining = []
+            for profile in job["profiles"]:
+                merged = dict(profile, **enriched.get(profile_key(profile["profileUrl"]), {}))
+                if shard.down and not merged.get("details"):
+                    # Lost the session before (or while) this profile was fetched
+                    remaining.append(profile)
+                    continue
+                merged["shard"] = shard.id
+                if merged.get("details"):
+                    self._count("enriched")
+                self._emit(merged)
+            if remaining:
+                # Hand the undetailed rest of the batch to the next shard on the ring
+                job["profiles"] = remaining
+                job["routingKey"] = profile_key(remaining[0]["profileUrl"])
+                return False
+
+        # Profile batches are routed by the owning shard of each profile key
+        by_shard = {}
+        for key, profile in discovered.items():
+            shard_id = self.ring.node_for(key, exclude=self._down_shards())
+            if shard_id is None:
+                self._emit(profile)
+                continue
+            by_shard.setdefault(shard_id, []).append(profile)
+        enrich_jobs = {}
+        for shard_id, shard_profiles in by_shard.items():
+            for start in range(0, len(shard_profiles), self.batch_size):
+                batch = shard_profiles[start:start + self.batch_size]
+                enrich_jobs.setdefault(shard_id, []).append(
+                    {"routingKey": profile_key(batch[0]["profileUrl"]), "profiles": batch})
+        # Batches nobody can enrich are still emitted with their search fields
+        self._run_shards(enrich_jobs, run_enrich, on_unroutable=lambda job: [self._emit(p) for p in job["profiles"]])
+
+    def shard_report(self):
+        """Per-shard job counts and health for the final result."""
+        return {shard_id: {"jobs": shard.jobs, "down": shard.down} for shard_id, shard in self.shards.items()}
+
+
+if __name__ == "__main__":
+    config = json.loads(sys.stdin.read())
+    channel = ipc.open_channel(config.get("logLevel", "info"))
+    result = {"success": False}
+    output = None
+    try:
+        data_dir = config.get("dataDir") or os.path.join(os.path.dirname(WORKER_SCRIPT), "..", "data", "shards")
+        coordinator = CrawlCoordinator(
+            config.get("accounts", []),
+            data_dir,
+            worker_args=dict(config.get("workerArgs", {}), logLevel=config.get("logLevel", "info")),
+            batch_size=config.get("batchSize", 20),
+        )
+        if not config.get("skipLogin", False):
+            coordinator.login_all()
+
+        profiles = coordinator.crawl(config.get("queries", []), config.get("profiles", []),
+                                     config.get("enrich", True))
+        pipeline = None
+        if config.get("postProcess"):
+            # Normalize, score and export on a process pool while the shards keep crawling
+            options = config["postProcess"]
+            pipeline = Pipeline(
+                workers=options.get("workers"),
+                chunk_size=options.get("chunkSize", 100),
+                score=options.get("score", False),
+                weights=options.get("weights"),
+                targets=options.get("targets"),
+                jsonl_path=config.get("output"),
+                csv_path=options.get("csv"),
+            )
+            profiles = pipeline.process(profiles)
+        elif config.get("output"):
+            output = open(config["output"], "a", encoding="utf-8")
+        for profile in profiles:
+            channel.item("profiles", profile)
+            if output:
+                output.write(json.dumps(profile) + "\n")
+        result["success"] = True
+        result["stats"] = coordinator.stats
+        if pipeline:
+            result["postProcess"] = pipeline.stats
+        result["shards"] = coordinator.shard_report()
+    except Exception as e:
+        result["error"] = str(e)
+        result["errorClass"] = scrape_errors.classify(e)
+    finally:
+        if output:
+            output.close()
+        channel.result(result)
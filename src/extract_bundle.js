@@ -0,0 +1,119 @@
+// Extraction functions installed once per document by script_registry.py.
+// Selenium calls are then a single window.__extract.<fn>(cfg) round trip
+// instead of one WebDriver command per card, link and field.
+(function () {
+  if (window.__extract && window.__extract.version === '__BUNDLE_VERSION__') {
+    return;
+  }
+
+  function text(el) {
+    return el ? (el.innerText || el.textContent || '').trim() : '';
+  }
+
+  function first(root, selectors) {
+    for (const selector of selectors || []) {
+      try {
+        const el = root.querySelector(selector);
+        if (el) {
+          return el;
+        }
+      } catch (e) {
+        // Invalid selector, try the next one
+      }
+    }
+    return null;
+  }
+
+  function nameFromLink(link) {
+    for (const span of link.querySelectorAll('span')) {
+      const value = text(span);
+      if (value.length > 1) {
+        return value;
+      }
+    }
+    return '';
+  }
+
+  function isProfileHref(href) {
+    return !!href && href.indexOf('/in/') !== -1;
+  }
+
+  function cardRecord(card, cfg) {
+    let link = first(card, cfg.linkSelectors);
+    if (!link || !isProfileHref(link.href)) {
+      link = Array.from(card.querySelectorAll("a[href*='/in/']")).find((a) => isProfileHref(a.href)) || null;
+    }
+    if (!link) {
+      return null;
+    }
+
+    let title = text(first(card, cfg.titleSelectors));
+    let location = text(first(card, cfg.locationSelectors));
+    if (!title || !location) {
+      const subtitles = card.querySelectorAll(cfg.subtitleSelector || '.t-14, .t-black--light');
+      title = title || text(subtitles[0]);
+      location = location || text(subtitles[1]);
+    }
+
+    const urnHolder = card.matches('[data-chameleon-result-urn]') ? card : card.querySelector('[data-chameleon-result-urn]');
+    return {
+      name: nameFromLink(link) || 'Unknown',
+      profileUrl: link.href,
+      title: title,
+      location: location,
+      memberUrn: urnHolder ? urnHolder.getAttribute('data-chameleon-result-urn') : null
+    };
+  }
+
+  window.__extract = {
+    version: '__BUNDLE_VERSION__',
+
+    // Profile cards of a people search results page
+    searchCards: function (cfg) {
+      for (const selector of cfg.cardSelectors || []) {
+        let cards;
+        try {
+          cards = document.querySelectorAll(selector);
+        } catch (e) {
+          continue;
+        }
+        if (!cards.length) {
+          continue;
+        }
+        const records = [];
+        for (const card of Array.from(cards).slice(0, cfg.maxResults || cards.length)) {
+          const record = cardRecord(card, cfg);
+          if (record) {
+            records.push(record);
+          }
+        }
+        return { selector: selector, cardCount: cards.length, records: records };
+      }
+      return { selector: null, cardCount: 0, records: [] };
+    },
+
+    // Fallback when no card selector matches: every /in/ link plus nearby title/location
+    profileLinks: function (cfg) {
+      const records = [];
+      for (const link of document.querySelectorAll("a[href*='/in/']")) {
+        if (!isProfileHref(link.href)) {
+          continue;
+        }
+        let title = '';
+        let location = '';
+        let parent = link;
+        for (let level = 0; level < 4 && parent.parentElement && !(title && location); level++) {
+          parent = parent.parentElement;
+          title = title || text(first(parent, cfg.titleSelectors));
+          location = location || text(first(parent, cfg.locationSelectors));
+        }
+        records.push({ name: nameFromLink(link) || 'Unknown', profileUrl: link.href, title: title, location: location });
+        // Several links usually point at the same person; Python deduplicates
+        if (cfg.maxResults && records.length >= cfg.maxResults * 3) {
+          break;
+        }
+      }
+      return { records: records };
+    }
+  };
+})();
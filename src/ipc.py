@@ -0,0 +1,107 @@
+#!/usr/bin/env python
+"""
+Typed message channel between the Python worker and pythonWrapper.js.
+
+Every message is one JSON object per line on stdout:
+
+    {"type": "<result|item|progress|log|metric>", "data": ...}
+
+json.dumps escapes embedded newlines, so a frame can never be split across
+lines. Large result sets are streamed as one ``item`` frame per record, sent as
+each record is finalised, followed by a small ``result`` frame that only
+carries the per-collection counts. Log frames below the requested level are dropped
+in the worker (see worker_logging.py) instead of being sent through the pipe.
+"""
+import json
+import sys
+import threading
+
+MESSAGE_TYPES = ("result", "item", "progress", "log", "metric")
+
+LOG_LEVELS = {"debug": 10, "info": 20, "warning": 30, "error": 40}
+
+
+class MessageChannel:
+    """Writes typed NDJSON frames to a dedicated stream."""
+
+    def __init__(self, stream, log_level="info"):
+        self._stream = stream
+        self._lock = threading.Lock()
+        # collection -> number of item frames sent
+        self.streamed = {}
+        self.log_threshold = LOG_LEVELS.get(str(log_level).lower(), LOG_LEVELS["info"])
+
+    def send(self, msg_type, data):
+        """Write a single frame."""
+        if msg_type not in MESSAGE_TYPES:
+            raise ValueError(f"Unknown message type: {msg_type}")
+        frame = json.dumps({"type": msg_type, "data": data}, default=str)
+        with self._lock:
+            self._stream.write(frame + "\n")
+            self._stream.flush()
+
+    def log(self, message, level="info"):
+        """Send a log frame if the level passes the threshold."""
+        if LOG_LEVELS.get(level, LOG_LEVELS["info"]) < self.log_threshold:
+            return
+        self.send("log", {"level": level, "message": message})
+
+    def progress(self, stage, current, total=None):
+        """Send a progress frame."""
+        self.send("progress", {"stage": stage, "current": current, "total": total})
+
+    def metric(self, name, value, **fields):
+        """Send a metric frame."""
+        self.send("metric", dict(fields, name=name, value=value))
+
+    def item(self, collection, record):
+        """Send one finished record of a collection as an item frame."""
+        self.send("item", {"collection": collection, "record": record})
+        self.streamed[collection] = self.streamed.get(collection, 0) + 1
+
+    def result(self, result, stream_key=None):
+        """
+        Send the final result. If stream_key names a list in the result, its
+        records are sent as item frames first. Only the counts of streamed
+        records go in the result frame.
+        """
+        result = dict(result)
+        if stream_key and isinstance(result.get(stream_key), list):
+            for item in result.pop(stream_key):
+                self.item(stream_key, item)
+        if self.streamed:
+            result["streamed"] = dict(self.streamed)
+        self.send("result", result)
+
+
+channel = None
+
+
+def open_channel(log_level="info"):
+    """
+    Claim stdout for framed messages and point sys.stdout at stderr, so a stray
+    print() (ours or a library's) cannot corrupt the stream.
+    """
+    global channel
+    if channel is None:
+        channel = MessageChannel(sys.stdout, log_level)
+        sys.stdout = sys.stderr
+    return channel
+
+
+def progress(stage, current, total=None):
+    """Send a progress frame if the channel is open."""
+    if channel is not None:
+        channel.progress(stage, current, total)
+
+
+def item(collection, record):
+    """Send an item frame if the channel is open."""
+    if channel is not None:
+        channel.item(collection, record)
+
+
+def metric(name, value, **fields):
+    """Send a metric frame if the channel is open."""
+    if channel is not None:
+        channel.metric(name, value, **fields)
@@ -0,0 +1,247 @@
+#!/usr/bin/env python
+"""
+Lead scoring and ranking for scraped profiles.
+
+Profiles from search_profiles() / get_profile_details() are flattened into
+pandas frames once, every feature is computed with vectorized string and
+array operations over the whole batch, and the weighted score is used to sort
+the batch. Run ``python lead_scoring.py --bench [n]`` to time rank_profiles()
+end to end on synthetic profile dicts.
+"""
+import re
+import sys
+import time
+from datetime import date
+from itertools import repeat
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_WEIGHTS = {
+    "seniority": 0.35,
+    "keywordMatch": 0.15,
+    "companyMatch": 0.15,
+    "locationMatch": 0.15,
+    "tenure": 0.1,
+    "education": 0.1,
+}
+
+# Checked from the top down; the first matching tier wins
+SENIORITY_TIERS = [
+    (1.0, r"\b(?:chief|ceo|cto|cfo|coo|cmo|cro|founder|co-founder|owner|president|partner)\b"),
+    (0.85, r"\b(?:vp|svp|evp|vice president)\b"),
+    (0.7, r"\b(?:director|head of)\b"),
+    (0.5, r"\b(?:manager|lead|principal)\b"),
+    (0.35, r"\b(?:senior|sr\.?|specialist|architect)\b"),
+    (0.0, r"\b(?:intern|internship|trainee|student)\b"),
+]
+DEFAULT_SENIORITY = 0.2
+
+# Years of experience at which the tenure feature saturates
+TENURE_CAP_YEARS = 15
+
+_YEAR_RANGE_RE = r"(\d{4})\D*?(\d{4}|present)?\s*$"
+
+
+def _terms(value):
+    """Normalize a target (string, list or None) into a list of non-empty strings."""
+    if not value:
+        return []
+    if isinstance(value, str):
+        value = [value]
+    return [str(v).strip() for v in value if v and str(v).strip()]
+
+
+def _factorized(series):
+    """
+    Split a string column into integer codes and its unique values.
+    Titles, locations and durations repeat heavily across a batch, so string
+    work is done once per unique value and broadcast back with the codes.
+    """
+    codes, uniques = pd.factorize(series.fillna(""))
+    return codes, pd.Series(uniques, dtype=object)
+
+
+def _contains(factorized, pattern):
+    """Vectorized case-insensitive regex search over a _factorized() column, as a boolean array."""
+    codes, uniques = factorized
+    return uniques.str.contains(pattern, case=False, regex=True).to_numpy(dtype=bool)[codes]
+
+
+def _match(factorized, terms):
+    """Vectorized case-insensitive 'contains any of terms' over a _factorized() column, as a float array."""
+    if not terms:
+        return np.zeros(len(factorized[0]))
+    pattern = "|".join(re.escape(t) for t in terms)
+    return _contains(factorized, pattern).astype(float)
+
+
+def profiles_to_frames(profiles):
+    """
+    Flatten profiles into a per-profile frame and a per-experience frame.
+    Search-level fields fall back to the details fields when empty.
+    Columns are built directly as lists; row ids of the nested frames come from np.repeat.
+    """
+    details = [profile.get("details") or {} for profile in profiles]
+    experiences = [d.get("experience") or () for d in details]
+    educations = [d.get("education") or () for d in details]
+    education_counts = np.fromiter(map(len, educations), dtype=np.int64, count=len(profiles))
+
+    frame = pd.DataFrame({
+        "title": [p.get("title") or d.get("headline") or "" for p, d in zip(profiles, details)],
+        "location": [p.get("location") or d.get("location") or "" for p, d in zip(profiles, details)],
+        "company": [exp[0].get("company", "") if exp else "" for exp in experiences],
+        "educationCount": education_counts,
+    })
+    experience_frame = pd.DataFrame({
+        "row": np.repeat(np.arange(len(profiles)), np.fromiter(map(len, experiences), dtype=np.int64,
+                                                                count=len(profiles))),
+        "duration": [exp.get("duration") or "" for exps in experiences for exp in exps],
+    })
+    school_frame = pd.DataFrame({
+        "row": np.repeat(np.arange(len(profiles)), education_counts),
+        "school": [edu.get("school") or "" for edus in educations for edu in edus],
+    })
+    return frame, experience_frame, school_frame
+
+
+def tenure_years(experience_frame, size, current_year=None):
+    """Years from the earliest experience start to the latest end, per profile."""
+    tenure = np.zeros(size)
+    if experience_frame.empty:
+        return tenure
+    current_year = current_year or date.today().year
+    codes, uniques = _factorized(experience_frame["duration"])
+    years = uniques.str.extract(_YEAR_RANGE_RE, flags=re.IGNORECASE)
+    start = pd.to_numeric(years[0], errors="coerce").to_numpy()
+    end = pd.to_numeric(years[1].str.lower().replace("present", str(current_year)), errors="coerce").to_numpy()
+    # A single year ("2019 - ...") with no end is treated as ongoing
+    end = np.where(np.isnan(end), current_year, end)
+    spans = pd.DataFrame({"row": experience_frame["row"].to_numpy(), "start": start[codes], "end": end[codes]}).dropna()
+    if spans.empty:
+        return tenure
+    grouped = spans.groupby("row").agg(start=("start", "min"), end=("end", "max"))
+    tenure[grouped.index.to_numpy()] = np.clip((grouped["end"] - grouped["start"]).to_numpy(), 0, None)
+    return tenure
+
+
+def compute_features(frame, experience_frame, school_frame, targets=None):
+    """Compute the feature matrix (one column per weight key) for a batch."""
+    targets = targets or {}
+    # Each column is factorized once and shared by every pattern matched against it
+    title = _factorized(frame["title"])
+
+    conditions = [_contains(title, pattern) for _, pattern in SENIORITY_TIERS]
+    seniority = np.select(conditions, [score for score, _ in SENIORITY_TIERS], default=DEFAULT_SENIORITY)
+
+    keyword_match = _match(title, _terms(targets.get("keywords")))
+    company_match = np.maximum(
+        _match(_factorized(frame["company"]), _terms(targets.get("companies"))),
+        _match(title, _terms(targets.get("companies"))),
+    )
+    location_match = _match(_factorized(frame["location"]), _terms(targets.get("locations")))
+    tenure = tenure_years(experience_frame, len(frame))
+
+    education = (frame["educationCount"].to_numpy() > 0).astype(float)
+    schools = _terms(targets.get("schools"))
+    if schools and not school_frame.empty:
+        school_hit = np.zeros(len(frame))
+        hits = school_frame["row"].to_numpy()[_match(_factorized(school_frame["school"]), schools) > 0]
+        school_hit[hits] = 1.0
+        # Attending a target school counts fully, any education counts half
+        education = np.maximum(education * 0.5, school_hit)
+
+    return pd.DataFrame({
+        "seniority": seniority,
+        "keywordMatch": keyword_match,
+        "companyMatch": company_match,
+        "locationMatch": location_match,
+        "tenure": np.minimum(tenure / TENURE_CAP_YEARS, 1.0),
+        "tenureYears": tenure,
+        "education": education,
+    })
+
+
+def score_frame(features, weights=None):
+    """Weighted sum of the feature columns, normalized to 0-100."""
+    weights = dict(DEFAULT_WEIGHTS, **(weights or {}))
+    columns = [key for key in DEFAULT_WEIGHTS if weights.get(key)]
+    if not columns:
+        return np.zeros(len(features))
+    weight_vector = np.array([weights[key] for key in columns], dtype=float)
+    return features[columns].to_numpy() @ weight_vector / weight_vector.sum() * 100
+
+
+def rank_profiles(profiles, weights=None, targets=None):
+    """
+    Score a batch of profiles and return them sorted best first.
+    score and scoreFeatures are attached to the profile dicts in place.
+    """
+    if not profiles:
+        return []
+    frame, experience_frame, school_frame = profiles_to_frames(profiles)
+    features = compute_features(frame, experience_frame, school_frame, targets)
+    scores = score_frame(features, weights)
+    order = np.argsort(-scores, kind="stable")
+
+    # Rounded columns as Python lists in ranked order; the per-profile dicts are built by map/zip in C
+    columns = list(features.columns)
+    values = [features[column].to_numpy().round(3)[order].tolist() for column in columns]
+    feature_dicts = map(dict, map(zip, repeat(columns), zip(*values)))
+    ranked = [profiles[i] for i in order.tolist()]
+    for profile, score, feature_dict in zip(ranked, scores[order].round(2).tolist(), feature_dicts):
+        profile["score"] = score
+        profile["scoreFeatures"] = feature_dict
+    return ranked
+
+
+def synthetic_profiles(n=100_000, seed=0):
+    """Build n search-result dicts with details, shaped like enrich_profiles() output."""
+    rng = np.random.default_rng(seed)
+    titles = ["VP Sales", "Senior Software Engineer", "Head of Marketing", "Account Executive",
+              "Chief Revenue Officer", "Sales Manager", "Intern", "Director of Partnerships"]
+    locations = ["Berlin, Germany", "London, United Kingdom", "New York, NY", "Paris, France"]
+    companies = ["Acme", "Globex", "Initech", "Umbrella", "Hooli"]
+    title_ids = rng.integers(0, len(titles), n).tolist()
+    location_ids = rng.integers(0, len(locations), n).tolist()
+    company_ids = rng.integers(0, len(companies), (n, 3)).tolist()
+    starts = rng.integers(1995, 2024, (n, 3)).tolist()
+    spans = rng.integers(0, 6, (n, 3)).tolist()
+    ongoing = (rng.random((n, 3)) < 0.3).tolist()
+    education_counts = rng.integers(0, 3, n).tolist()
+    mit = (rng.random(n) < 0.1).tolist()
+
+    profiles = []
+    for i in range(n):
+        profiles.append({
+            "name": f"Person {i}",
+            "profileUrl": f"https://www.linkedin.com/in/person-{i}/",
+            "title": titles[title_ids[i]],
+            "location": locations[location_ids[i]],
+            "details": {
+                "experience": [{
+                    "title": titles[title_ids[i]],
+                    "company": companies[company_ids[i][k]],
+                    "duration": f"{starts[i][k]} - " + ("Present" if ongoing[i][k] else str(starts[i][k] + spans[i][k])),
+                } for k in range(3)],
+                "education": [{"school": "MIT" if mit[i] else "State University"}] * education_counts[i],
+            },
+        })
+    return profiles
+
+
+def benchmark(n=100_000, seed=0):
+    """Time rank_profiles() end to end over n synthetic profile dicts; returns seconds."""
+    profiles = synthetic_profiles(n, seed)
+    targets = {"keywords": ["sales"], "companies": ["Acme"], "locations": ["Berlin"], "schools": ["MIT"]}
+
+    started = time.perf_counter()
+    rank_profiles(profiles, targets=targets)
+    return time.perf_counter() - started
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "--bench":
+        n = int(sys.argv[2]) if len(sys.argv) > 2 else 100_000
+        elapsed = benchmark(n)
+        print(f"Scored {n} records in {elapsed:.3f}s ({n / elapsed:,.0f} records/s)")
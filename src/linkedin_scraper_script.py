@@ -3,6 +3,7 @@ import sys
 import json
 import time
 import random
+import logging
 from linkedin_scraper import Person, actions
 from selenium import webdriver
 from selenium.webdriver.chrome.options import Options
@@ -10,11 +11,72 @@ from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import TimeoutException, NoSuchElementException
+from profile_index import ProfileIndex, profile_key, canonical_profile_url, site_profile_url
+import ipc
+import worker_logging
+from resource_governor import ResourceGovernor
+from search_url import FacetLookup, build_search_url, typeahead_resolver
+import scrape_errors
+from scrape_errors import ScrapeError, CircuitBreaker, CircuitOpenError
+from script_registry import ScriptRegistry
+from snapshot_archive import SnapshotArchive
 
-# Redirect all print statements to stderr except the final JSON result
-def log(message):
-    """Print log messages to stderr instead of stdout"""
-    print(message, file=sys.stderr)
+logger = logging.getLogger(worker_logging.LOGGER_NAME)
+
+# Overridable with the baseUrl argument, e.g. to run against a local stand-in server
+LINKEDIN_BASE_URL = "https://www.linkedin.com"
+
+# stdout carries only framed IPC messages (see ipc.py); logs are written by a background thread
+def log(message, *args, level="info", **fields):
+    """Queue a log record; records below the configured level are never built"""
+    levelno = logging.getLevelName(level.upper())
+    if logger.isEnabledFor(levelno):
+        logger.log(levelno, message, *args, extra={"fields": fields} if fields else None)
+
+# Injected into every new document to hide automation
+STEALTH_SCRIPT = """
+    // Overwrite the 'webdriver' property
+    Object.defineProperty(navigator, 'webdriver', {
+        get: () => undefined
+    });
+    
+    // Overwrite the automation-related properties
+    Object.defineProperty(navigator, 'maxTouchPoints', {
+        get: () => 1
+    });
+    
+    // Overwrite the languages property
+    Object.defineProperty(navigator, 'languages', {
+        get: () => ['en-US', 'en', 'es']
+    });
+    
+    // Overwrite the plugins property
+    Object.defineProperty(navigator, 'plugins', {
+        get: () => [1, 2, 3, 4, 5]
+    });
+    
+    // Additional evasions
+    const originalQuery = window.navigator.permissions.query;
+    window.navigator.permissions.query = (parameters) => (
+        parameters.name === 'notifications' ?
+        Promise.resolve({ state: Notification.permission }) :
+        originalQuery(parameters)
+    );
+    
+    // Prevent fingerprinting based on hardware
+    Object.defineProperty(navigator, 'hardwareConcurrency', {
+        get: () => 8
+    });
+    
+    // Prevent fingerprinting based on device memory
+    Object.defineProperty(navigator, 'deviceMemory', {
+        get: () => 8
+    });
+    """
+
+def install_init_scripts(driver):
+    """Register the init scripts for the current tab (needed again for every new tab)."""
+    driver.execute_cdp_cmd("Page.addScriptToEvaluateOnNewDocument", {"source": STEALTH_SCRIPT})
 
 def setup_driver(headless=False, user_data_dir=None):
     """Set up the Chrome driver with options."""
@@ -72,54 +134,14 @@ def setup_driver(headless=False, user_data_dir=None):
         driver = webdriver.Chrome(options=chrome_options)
         
         # Execute CDP commands to hide automation
-        driver.execute_cdp_cmd("Page.addScriptToEvaluateOnNewDocument", {
-            "source": """
-            // Overwrite the 'webdriver' property
-            Object.defineProperty(navigator, 'webdriver', {
-                get: () => undefined
-            });
-            
-            // Overwrite the automation-related properties
-            Object.defineProperty(navigator, 'maxTouchPoints', {
-                get: () => 1
-            });
-            
-            // Overwrite the languages property
-            Object.defineProperty(navigator, 'languages', {
-                get: () => ['en-US', 'en', 'es']
-            });
-            
-            // Overwrite the plugins property
-            Object.defineProperty(navigator, 'plugins', {
-                get: () => [1, 2, 3, 4, 5]
-            });
-            
-            // Additional evasions
-            const originalQuery = window.navigator.permissions.query;
-            window.navigator.permissions.query = (parameters) => (
-                parameters.name === 'notifications' ?
-                Promise.resolve({ state: Notification.permission }) :
-                originalQuery(parameters)
-            );
-            
-            // Prevent fingerprinting based on hardware
-            Object.defineProperty(navigator, 'hardwareConcurrency', {
-                get: () => 8
-            });
-            
-            // Prevent fingerprinting based on device memory
-            Object.defineProperty(navigator, 'deviceMemory', {
-                get: () => 8
-            });
-            """
-        })
+        install_init_scripts(driver)
         
         # Set window size explicitly
         driver.set_window_size(1920, 1080)
         
         return driver
     except Exception as e:
-        log(f"Error creating Chrome driver: {str(e)}")
+        log("Error creating Chrome driver: %s", e, level="warning")
         # If we fail with the user data directory, try again without it
         if user_data_dir:
             log("Trying to start Chrome without user data directory...")
@@ -147,7 +169,7 @@ def login_linkedin(driver, email, password):
         log("Attempting to login to LinkedIn...")
         
         # Navigate to login page with a randomized approach
-        driver.get("https://www.linkedin.com")
+        driver.get(LINKEDIN_BASE_URL)
         time.sleep(random.uniform(2, 4))  # Random wait to seem more human-like
         
         # Check if we're already on the login page, if not, find and click the sign-in button
@@ -173,7 +195,7 @@ def login_linkedin(driver, email, password):
                         continue
             except Exception as e:
                 log(f"Could not find sign-in button, directly navigating to login page: {str(e)}")
-                driver.get("https://www.linkedin.com/login")
+                driver.get(f"{LINKEDIN_BASE_URL}/login")
                 time.sleep(random.uniform(2, 3))
         
         # Wait for username field with multiple retries
@@ -333,10 +355,10 @@ def login_linkedin(driver, email, password):
             return False
         
     except Exception as e:
-        log(f"Login error: {str(e)}")
+        log("Login error: %s", e, level="error")
         # Log full traceback for debugging
         import traceback
-        log(f"Stacktrace: {traceback.format_exc()}")
+        log("Stacktrace: %s", traceback.format_exc(), level="debug")
         
         # Take a screenshot for debugging
         try:
@@ -397,7 +419,7 @@ def is_logged_in(driver):
         # If we're still unsure, navigate to the feed and check again
         if "/feed" not in current_url:
             log("Login status unclear, attempting to navigate to feed")
-            driver.get("https://www.linkedin.com/feed/")
+            driver.get(f"{LINKEDIN_BASE_URL}/feed/")
             time.sleep(random.uniform(2, 3))
             
             # Check if we were redirected to the login page
@@ -414,32 +436,114 @@ def is_logged_in(driver):
         return False
         
     except Exception as e:
-        log(f"Error checking login status: {str(e)}")
+        log("Error checking login status: %s", e, level="warning")
         return False
 
-def search_profiles(driver, keywords, location=None, max_results=10):
-    """Search for profiles based on keywords and location."""
+# Search result selectors, shared by the Selenium path and the extraction bundle (extract_bundle.js)
+SPECIFIC_CARD_SELECTORS = [
+    "li.vkZEvhSqLOnLWodnFYCRDBnmsEjqiYVTw",
+    "div.iApnJXUiSsjqmiRQZkvmEoajuUczHMyoNFl",
+    "div[class*='LbjsZYFQzzAaOzYtctfbmFlDsqCMvbkzCVOwk']",
+    "div[data-chameleon-result-urn*='urn:li:member:']"
+]
+
+GENERIC_CARD_SELECTORS = [
+    # Other potential selectors
+    "div.pserp-layout__result-item",
+    "li.reusable-search__result-container",
+    "div.entity-result",
+    "div.search-entity-result",
+    "div.search-results-entity-result",
+    ".reusable-search__result-container",
+    ".entity-result",
+    ".search-results__result-item",
+    "li.artdeco-list__item",
+    ".artdeco-list__item",
+    ".ember-view.artdeco-list__item",
+    "[data-view-name='search-result-item']",
+    # Generic list item selectors that might contain profile results
+    "li.search-result",
+    "ul.reusable-search__entity-result-list > li",
+    "ul.artdeco-list > li"
+]
+
+PROFILE_LINK_SELECTOR = "a.eBOSiHffioaRqrowDPILgMQbHBQe"
+TITLE_SELECTOR = "div.tvZyUTymqQUmWAonPMfdpcDvzAIYFHuWLfBUE"
+LOCATION_SELECTOR = "div.HhmzfnhfsJBnlckYHmnKptNFyvpjjiSpBs"
+SUBTITLE_SELECTOR = ".t-14, .t-black--light"
+
+def extract_profiles_with_bundle(driver, script_registry, max_results):
+    """
+    Extract search results in one in-page call per strategy via the extraction bundle.
+    Returns None when neither cards nor profile links are found, so the caller can
+    fall back to the per-element Selenium path.
+    """
+    cfg = {
+        "cardSelectors": SPECIFIC_CARD_SELECTORS + GENERIC_CARD_SELECTORS,
+        "linkSelectors": [PROFILE_LINK_SELECTOR],
+        "titleSelectors": [TITLE_SELECTOR],
+        "locationSelectors": [LOCATION_SELECTOR],
+        "subtitleSelector": SUBTITLE_SELECTOR,
+        "maxResults": max_results
+    }
+    extracted = script_registry.call(driver, "searchCards", cfg)
+    if extracted["cardCount"]:
+        log(f"Found {extracted['cardCount']} profile cards with selector: {extracted['selector']}")
+    else:
+        log("No profile cards found with selectors. Trying direct link approach...")
+        extracted = script_registry.call(driver, "profileLinks", cfg)
+        if not extracted["records"]:
+            return None
+
+    results = []
+    processed_urls = set()
+    for record in extracted["records"]:
+        profile_url = canonical_profile_url(record["profileUrl"])
+        key = profile_key(profile_url) or profile_url
+        if key in processed_urls:
+            continue
+        processed_urls.add(key)
+
+        profile = {
+            "name": record["name"],
+            "profileUrl": profile_url,
+            "title": record["title"],
+            "location": record["location"]
+        }
+        if record.get("memberUrn"):
+            profile["memberUrn"] = record["memberUrn"]
+        results.append(profile)
+        if len(results) >= max_results:
+            break
+
+    log(f"Successfully extracted {len(results)} profiles from search results")
+    return results
+
+def search_profiles(driver, keywords, location=None, max_results=10, filters=None, facet_lookup=None,
+                    script_registry=None, archive=None):
+    """
+    Search for profiles based on keywords, location and the advanced filters
+    (currentCompany, industry, school, connectionDegree), applied as server-side facets.
+    Returns [] only when the search genuinely has no results; failures raise ScrapeError.
+    """
     try:
-        log(f"Searching for profiles with keywords: '{keywords}', location: '{location}'")
-        
-        # Construct search URL with proper encoding
-        search_url = "https://www.linkedin.com/search/results/people/?"
+        filters = dict(filters or {}, location=location)
+        log(f"Searching for profiles with keywords: '{keywords}', filters: {filters}")
         
-        # Add keywords if provided
-        if keywords:
-            from urllib.parse import quote
-            search_url += f"keywords={quote(keywords)}"
-        
-        # Add location if provided
-        if location:
-            from urllib.parse import quote
-            location_param = f"&geoUrn=%5B%22{quote(location)}%22%5D"
-            search_url += location_param
+        # Construct search URL with facet parameters
+        search_url, unapplied = build_search_url(keywords, filters, facet_lookup, base_url=LINKEDIN_BASE_URL)
+        if unapplied:
+            log(f"Filters without a server-side facet (not applied): {', '.join(unapplied)}", level="warning")
         
         # Navigate to search page
         log(f"Navigating to search URL: {search_url}")
         driver.get(search_url)
         
+        # Being bounced to a login/checkpoint page is not "no results"
+        page_class = scrape_errors.inspect_page(driver)
+        if page_class:
+            raise ScrapeError(f"Search page unavailable ({page_class}): {driver.current_url}", page_class, search_url)
+        
         # Wait for page to load and results to appear
         try:
             log("Waiting for search results to load...")
@@ -464,6 +568,10 @@ def search_profiles(driver, keywords, location=None, max_results=10):
             # Add a small delay to ensure all results load
             time.sleep(5)
             
+            # Keep the raw page so broken selectors can be debugged and re-parsed offline
+            if archive:
+                archive.capture(driver, "search", keywords=keywords, filters=filters)
+            
             # Check for "No results found" message
             try:
                 for no_results_selector in [
@@ -482,18 +590,20 @@ def search_profiles(driver, keywords, location=None, max_results=10):
             log("Taking screenshot of the search results page for debugging...")
             driver.save_screenshot("search_results.png")
             
+            # One in-page call instead of several WebDriver round trips per card
+            if script_registry:
+                try:
+                    results = extract_profiles_with_bundle(driver, script_registry, max_results)
+                    if results is not None:
+                        return results
+                except Exception as e:
+                    log("Extraction bundle failed, falling back to Selenium: %s", e, level="warning")
+            
             # 2025 specific selectors based on the provided HTML structure
             profile_cards = []
             
             # First try the specific profile card selector from the example
-            specific_card_selectors = [
-                "li.vkZEvhSqLOnLWodnFYCRDBnmsEjqiYVTw",
-                "div.iApnJXUiSsjqmiRQZkvmEoajuUczHMyoNFl",
-                "div[class*='LbjsZYFQzzAaOzYtctfbmFlDsqCMvbkzCVOwk']",
-                "div[data-chameleon-result-urn*='urn:li:member:']"
-            ]
-            
-            for selector in specific_card_selectors:
+            for selector in SPECIFIC_CARD_SELECTORS:
                 try:
                     cards = driver.find_elements(By.CSS_SELECTOR, selector)
                     if cards and len(cards) > 0:
@@ -501,31 +611,11 @@ def search_profiles(driver, keywords, location=None, max_results=10):
                         profile_cards = cards
                         break
                 except Exception as e:
-                    log(f"Error with 2025 specific selector {selector}: {str(e)}")
+                    log("Error with 2025 specific selector %s: %s", selector, e, level="debug")
             
             # If specific selectors didn't work, try other potential selectors
             if not profile_cards:
-                possible_selectors = [
-                    # Other potential selectors
-                    "div.pserp-layout__result-item",
-                    "li.reusable-search__result-container",
-                    "div.entity-result",
-                    "div.search-entity-result",
-                    "div.search-results-entity-result",
-                    ".reusable-search__result-container",
-                    ".entity-result",
-                    ".search-results__result-item",
-                    "li.artdeco-list__item",
-                    ".artdeco-list__item",
-                    ".ember-view.artdeco-list__item",
-                    "[data-view-name='search-result-item']",
-                    # Generic list item selectors that might contain profile results
-                    "li.search-result",
-                    "ul.reusable-search__entity-result-list > li",
-                    "ul.artdeco-list > li"
-                ]
-                
-                for selector in possible_selectors:
+                for selector in GENERIC_CARD_SELECTORS:
                     try:
                         cards = driver.find_elements(By.CSS_SELECTOR, selector)
                         if cards and len(cards) > 0:
@@ -533,7 +623,7 @@ def search_profiles(driver, keywords, location=None, max_results=10):
                             profile_cards = cards
                             break
                     except Exception as e:
-                        log(f"Error with selector {selector}: {str(e)}")
+                        log("Error with selector %s: %s", selector, e, level="debug")
             
             # If no cards found yet, try direct link approach
             if not profile_cards:
@@ -541,6 +631,9 @@ def search_profiles(driver, keywords, location=None, max_results=10):
                 results = extract_profiles_from_links(driver, max_results)
                 if results:
                     return results
+                # No empty-results marker, no cards and no profile links: the page changed
+                raise ScrapeError("No profile cards or links found on the search results page",
+                                  scrape_errors.inspect_page(driver) or scrape_errors.STRUCTURE_CHANGED, search_url)
             
             # Process the profile cards to extract data
             results = []
@@ -552,15 +645,22 @@ def search_profiles(driver, keywords, location=None, max_results=10):
                     # Extract profile URL - directly target the specific class from the example
                     profile_url = None
                     profile_name = "Unknown"
+                    member_urn = None
+                    
+                    # Keep the member URN so vanity and URN variants can be linked in the index
+                    try:
+                        member_urn = card.get_attribute("data-chameleon-result-urn")
+                    except:
+                        pass
                     
                     # Try 2025 specific selectors first
                     try:
                         # Target the specific class for links from the example
-                        link_elem = card.find_element(By.CSS_SELECTOR, "a.eBOSiHffioaRqrowDPILgMQbHBQe")
+                        link_elem = card.find_element(By.CSS_SELECTOR, PROFILE_LINK_SELECTOR)
                         if link_elem:
                             profile_url = link_elem.get_attribute("href")
                             if profile_url:
-                                profile_url = profile_url.split("?")[0]  # Remove tracking parameters
+                                profile_url = canonical_profile_url(profile_url)  # Remove tracking parameters and locale variants
                                 
                                 # Extract name from the link
                                 span_elems = link_elem.find_elements(By.TAG_NAME, "span")
@@ -569,7 +669,7 @@ def search_profiles(driver, keywords, location=None, max_results=10):
                                         profile_name = span.text.strip()
                                         break
                     except Exception as e:
-                        log(f"Error with 2025 specific link selector: {str(e)}")
+                        log("Error with 2025 specific link selector: %s", e, level="debug", card=i + 1)
                     
                     # If specific selectors failed, try generic approach
                     if not profile_url:
@@ -580,7 +680,7 @@ def search_profiles(driver, keywords, location=None, max_results=10):
                                 for link in links:
                                     href = link.get_attribute("href")
                                     if href and "/in/" in href:
-                                        profile_url = href.split("?")[0]
+                                        profile_url = canonical_profile_url(href)
                                         
                                         # Try to get name
                                         try:
@@ -594,18 +694,19 @@ def search_profiles(driver, keywords, location=None, max_results=10):
                                         
                                         break
                         except Exception as e:
-                            log(f"Error with generic link extraction: {str(e)}")
+                            log("Error with generic link extraction: %s", e, level="debug", card=i + 1)
                     
                     if not profile_url:
-                        log(f"Could not find profile URL in card {i+1}")
+                        log("Could not find profile URL in card %d", i + 1, level="debug")
                         continue
                     
-                    # Skip if this URL has already been processed
-                    if profile_url in processed_urls:
-                        log(f"Skipping duplicate profile URL: {profile_url}")
+                    # Skip if this person has already been processed
+                    key = profile_key(profile_url) or profile_url
+                    if key in processed_urls:
+                        log("Skipping duplicate profile URL: %s", profile_url, level="debug")
                         continue
                     
-                    processed_urls.add(profile_url)
+                    processed_urls.add(key)
                     
                     # Extract title and location using 2025 specific classes
                     title = ""
@@ -613,13 +714,13 @@ def search_profiles(driver, keywords, location=None, max_results=10):
                     
                     # Try 2025 specific title selector
                     try:
-                        title_elem = card.find_element(By.CSS_SELECTOR, "div.tvZyUTymqQUmWAonPMfdpcDvzAIYFHuWLfBUE")
+                        title_elem = card.find_element(By.CSS_SELECTOR, TITLE_SELECTOR)
                         if title_elem:
                             title = title_elem.text.strip()
                     except:
                         # Try generic approach
                         try:
-                            subtitle_elems = card.find_elements(By.CSS_SELECTOR, ".t-14, .t-black--light")
+                            subtitle_elems = card.find_elements(By.CSS_SELECTOR, SUBTITLE_SELECTOR)
                             if subtitle_elems and len(subtitle_elems) > 0:
                                 title = subtitle_elems[0].text.strip()
                         except:
@@ -627,43 +728,48 @@ def search_profiles(driver, keywords, location=None, max_results=10):
                     
                     # Try 2025 specific location selector
                     try:
-                        location_elem = card.find_element(By.CSS_SELECTOR, "div.HhmzfnhfsJBnlckYHmnKptNFyvpjjiSpBs")
+                        location_elem = card.find_element(By.CSS_SELECTOR, LOCATION_SELECTOR)
                         if location_elem:
                             location = location_elem.text.strip()
                     except:
                         # Try generic approach
                         try:
-                            subtitle_elems = card.find_elements(By.CSS_SELECTOR, ".t-14, .t-black--light")
+                            subtitle_elems = card.find_elements(By.CSS_SELECTOR, SUBTITLE_SELECTOR)
                             if subtitle_elems and len(subtitle_elems) > 1:
                                 location = subtitle_elems[1].text.strip()
                         except:
                             pass
                     
                     # Add the profile to results
-                    results.append({
+                    profile = {
                         "name": profile_name,
                         "profileUrl": profile_url,
                         "title": title,
                         "location": location
-                    })
+                    }
+                    if member_urn:
+                        profile["memberUrn"] = member_urn
+                    results.append(profile)
                     
-                    log(f"Added profile {i+1}: {profile_name} - {profile_url}")
+                    log("Added profile %d: %s - %s", i + 1, profile_name, profile_url, level="debug", card=i + 1, profileUrl=profile_url)
                     
                 except Exception as e:
-                    log(f"Error processing profile card {i+1}: {str(e)}")
+                    log("Error processing profile card %d: %s", i + 1, e, level="warning", card=i + 1)
             
             log(f"Successfully extracted {len(results)} profiles from search results")
             return results
             
         except Exception as e:
-            log(f"Error extracting profiles: {str(e)}")
+            log("Error extracting profiles: %s", e, level="error")
             import traceback
-            log(f"Traceback: {traceback.format_exc()}")
-            return []
+            log("Traceback: %s", traceback.format_exc(), level="debug")
+            raise
             
+    except ScrapeError:
+        raise
     except Exception as e:
-        log(f"Search error: {str(e)}")
-        return []
+        log("Search error: %s", e, level="error")
+        raise ScrapeError(f"Search error: {str(e)}", scrape_errors.classify(e, driver)) from e
 
 def extract_profiles_from_links(driver, max_results):
     """Extract profiles directly from links when card selectors fail."""
@@ -684,13 +790,14 @@ def extract_profiles_from_links(driver, max_results):
             try:
                 href = link.get_attribute("href")
                 if href and "/in/" in href:
-                    profile_url = href.split("?")[0]  # Remove tracking parameters
+                    profile_url = canonical_profile_url(href)  # Remove tracking parameters and locale variants
                     
                     # Skip if already processed
-                    if profile_url in processed_urls:
+                    key = profile_key(profile_url) or profile_url
+                    if key in processed_urls:
                         continue
                     
-                    processed_urls.add(profile_url)
+                    processed_urls.add(key)
                     
                     # Try to get name
                     name = "Unknown"
@@ -716,14 +823,14 @@ def extract_profiles_from_links(driver, max_results):
                                 
                                 # Try to find title and location in this parent
                                 try:
-                                    title_elem = parent.find_element(By.CSS_SELECTOR, "div.tvZyUTymqQUmWAonPMfdpcDvzAIYFHuWLfBUE")
+                                    title_elem = parent.find_element(By.CSS_SELECTOR, TITLE_SELECTOR)
                                     if title_elem:
                                         title = title_elem.text.strip()
                                 except:
                                     pass
                                 
                                 try:
-                                    location_elem = parent.find_element(By.CSS_SELECTOR, "div.HhmzfnhfsJBnlckYHmnKptNFyvpjjiSpBs")
+                                    location_elem = parent.find_element(By.CSS_SELECTOR, LOCATION_SELECTOR)
                                     if location_elem:
                                         location = location_elem.text.strip()
                                 except:
@@ -746,24 +853,35 @@ def extract_profiles_from_links(driver, max_results):
                         "location": location
                     })
                     
-                    log(f"Added profile from direct link: {name} - {profile_url}")
+                    log("Added profile from direct link: %s - %s", name, profile_url, level="debug", profileUrl=profile_url)
                     
                     # Check if we have enough results
                     if len(results) >= max_results:
                         break
             except Exception as e:
-                log(f"Error processing link: {str(e)}")
+                log("Error processing link: %s", e, level="debug")
         
         log(f"Successfully extracted {len(results)} profiles from direct links")
         return results
     except Exception as e:
-        log(f"Error in extract_profiles_from_links: {str(e)}")
+        log("Error in extract_profiles_from_links: %s", e, level="error")
         return []
 
-def get_profile_details(driver, profile_url):
-    """Get detailed information about a specific profile."""
+def get_profile_details(driver, profile_url, archive=None):
+    """Get detailed information about a specific profile. Failures raise ScrapeError."""
     try:
-        person = Person(profile_url, driver=driver, close_on_complete=False)
+        if archive:
+            # Load the profile without scraping so the snapshot is the profile page itself;
+            # scrape() moves on to the /details/* sub-pages
+            person = Person(profile_url, driver=driver, scrape=False, close_on_complete=False)
+            try:
+                WebDriverWait(driver, 10).until(EC.presence_of_element_located((By.TAG_NAME, "main")))
+            except TimeoutException:
+                pass
+            archive.capture(driver, "profile", profileUrl=profile_url)
+            person.scrape(close_on_complete=False)
+        else:
+            person = Person(profile_url, driver=driver, close_on_complete=False)
         
         # Format experience
         experience = []
@@ -801,17 +919,124 @@ def get_profile_details(driver, profile_url):
         }
     
     except Exception as e:
-        log(f"Profile details error: {str(e)}")
-        return None
+        log("Profile details error: %s", e, level="warning", profileUrl=profile_url)
+        if archive:
+            archive.capture(driver, "profile_error", profileUrl=profile_url, error=str(e))
+        raise ScrapeError(f"Profile details error: {str(e)}", scrape_errors.classify(e, driver), profile_url) from e
+
+def fill_card_fields(profile, details):
+    """Fill search card fields missing on profiles enriched from a bare URL from their details."""
+    if profile.get("name") in (None, "", "Unknown") and details.get("name"):
+        profile["name"] = details["name"]
+    if not profile.get("title") and details.get("headline"):
+        profile["title"] = details["headline"]
+    if not profile.get("location") and details.get("location"):
+        profile["location"] = details["location"]
+
+def enrich_profiles(driver, profiles, max_detailed, profile_index=None, max_age_seconds=None, governor=None, breaker=None,
+                    archive=None, emit=None):
+    """
+    Attach details to the first max_detailed profiles.
+    Profiles already enriched in the index are merged from it instead of being fetched again.
+    With a governor, browser memory is checked before every profile page load.
+    With a breaker, failures are counted per error class and CircuitOpenError
+    stops the batch once one class keeps failing.
+    With an archive, the source of every fetched profile page is kept.
+    With emit, each of the first max_detailed profiles is passed to it as soon as it is final.
+    """
+    if profile_index:
+        for profile in profiles:
+            if profile.get("memberUrn"):
+                profile_index.add_alias(profile["memberUrn"], profile["profileUrl"])
+            profile_index.upsert(profile)
+    
+    fetched = 0
+    total = min(len(profiles), max_detailed)
+    for i, profile in enumerate(profiles[:max_detailed]):
+        ipc.progress("enrich", i + 1, total)
+        try:
+            cached = profile_index.cached_details(profile["profileUrl"], max_age_seconds) if profile_index else None
+            if cached:
+                log("Using indexed details for known profile: %s", profile["profileUrl"], level="debug")
+                profile["details"] = cached
+                fill_card_fields(profile, cached)
+            else:
+                if breaker:
+                    breaker.before_call()
+                if governor:
+                    driver = governor.check()
+                detailed_info = get_profile_details(driver, site_profile_url(profile["profileUrl"], LINKEDIN_BASE_URL), archive)
+                if breaker:
+                    breaker.record_success()
+                if detailed_info:
+                    profile["details"] = detailed_info
+                    fetched += 1
+                    fill_card_fields(profile, detailed_info)
+                    if profile_index:
+                        profile_index.upsert(profile, detailed_info)
+                        # The profile page may redirect an id URL to the vanity URL (or vice versa)
+                        profile_index.add_alias(driver.current_url, profile["profileUrl"])
+        except CircuitOpenError:
+            raise
+        except Exception as e:
+            error_class = scrape_errors.classify(e, driver)
+            profile["detailsError"] = error_class
+            if breaker:
+                breaker.record_failure(error_class)
+            log("Error getting details for profile %d (%s): %s", i, error_class, e, level="warning", profileUrl=profile["profileUrl"])
+        if emit:
+            emit(profile)
+    
+    log(f"Enriched {fetched} profiles, {min(len(profiles), max_detailed) - fetched} served from index or skipped")
+    return profiles
 
 if __name__ == "__main__":
     # Get arguments from stdin as JSON
     args = json.loads(sys.stdin.read())
+    channel = ipc.open_channel(args.get("logLevel", "info"))
+    worker_logging.setup_logging(args.get("logLevel", "info"))
     
     action = args.get("action")
     email = args.get("email")
     password = args.get("password")
     user_data_dir = args.get("userDataDir")
+    LINKEDIN_BASE_URL = args.get("baseUrl", LINKEDIN_BASE_URL).rstrip("/")
+    
+    # Shared index of known profiles (optional)
+    profile_index = ProfileIndex(args["profileIndexPath"]) if args.get("profileIndexPath") else None
+    max_age_days = args.get("profileMaxAgeDays", 30)
+    max_age_seconds = max_age_days * 86400 if max_age_days is not None else None
+    
+    # Local search is answered from the index alone, without starting a browser
+    if action == "local_search":
+        result = {"success": False}
+        try:
+            if not profile_index:
+                raise ValueError("local_search requires profileIndexPath")
+            started = time.perf_counter()
+            filters = {name: args[name] for name in ("name", "title", "location", "company", "school") if args.get(name)}
+            result["profiles"] = profile_index.search(
+                args.get("query", ""),
+                filters,
+                enriched_only=args.get("enrichedOnly", False),
+                limit=args.get("maxResults", 20)
+            )
+            result["tookMs"] = round((time.perf_counter() - started) * 1000, 2)
+            result["success"] = True
+        except Exception as e:
+            log("Local search error: %s", e, level="error")
+            result["error"] = str(e)
+        finally:
+            worker_logging.shutdown_logging()
+            channel.result(result, stream_key="profiles")
+            if profile_index:
+                profile_index.close()
+        sys.exit(0 if result["success"] else 1)
+    
+    # Raw page sources of search and profile pages (optional)
+    archive = None
+    if args.get("archiveDir"):
+        archive = SnapshotArchive(args["archiveDir"], max_bytes=args.get("archiveMaxMb", 512) * 1024 * 1024)
     
     # Initialize driver
     try:
@@ -820,14 +1045,31 @@ if __name__ == "__main__":
             user_data_dir=user_data_dir
         )
         
+        # Recycles the tab or restarts the driver when browser memory grows too large
+        governor = ResourceGovernor(
+            lambda: setup_driver(headless=args.get("headless", False), user_data_dir=user_data_dir),
+            driver=driver,
+            prepare_tab=install_init_scripts,
+            tab_recycle_heap_mb=args.get("tabRecycleHeapMb", 512),
+            max_heap_mb=args.get("maxHeapMb", 1024),
+            max_rss_mb=args.get("maxRssMb", 3072),
+            check_every=args.get("memoryCheckEvery", 1),
+            home_url=f"{LINKEDIN_BASE_URL}/"
+        )
+        
         result = {"success": False}
+        breaker = CircuitBreaker(args.get("breakerThresholds"), args.get("breakerPauses"))
+        # In-page extraction bundle; useExtractionBundle=false forces the per-element Selenium path
+        script_registry = ScriptRegistry() if args.get("useExtractionBundle", True) else None
         
         try:
             if action == "login":
                 # Login to LinkedIn
                 result["success"] = login_linkedin(driver, email, password)
+                if not result["success"]:
+                    result["errorClass"] = scrape_errors.inspect_page(driver) or scrape_errors.AUTH_LOST
             
-            elif action == "search":
+            elif action in ("search", "enrich"):
                 # Check if already logged in or login
                 if args.get("skipLogin", False):
                     # Check if already logged in when skipLogin is true
@@ -835,42 +1077,71 @@ if __name__ == "__main__":
                     if not login_status:
                         log("Session validation failed: User is not logged in despite skipLogin=true")
                         result["error"] = "Not logged in to LinkedIn. Please log in first or provide credentials."
-                        # Only JSON result should go to stdout
-                        print(json.dumps(result))
-                        driver.quit()
+                        result["errorClass"] = scrape_errors.inspect_page(driver) or scrape_errors.AUTH_LOST
+                        # The finally block below sends the result and quits the driver
                         sys.exit(1)
                 else:
                     # Regular login with credentials
                     login_success = login_linkedin(driver, email, password)
                     if not login_success:
                         result["error"] = "Login failed"
-                        # Only JSON result should go to stdout
-                        print(json.dumps(result))
-                        driver.quit()
+                        result["errorClass"] = scrape_errors.inspect_page(driver) or scrape_errors.AUTH_LOST
+                        # The finally block below sends the result and quits the driver
                         sys.exit(1)
                 
-                # Search for profiles
-                profiles = search_profiles(
-                    driver, 
-                    args.get("keywords", ""),
-                    args.get("location", ""),
-                    args.get("maxResults", 10)
-                )
-                
-                # Get detailed profile info if requested
-                if args.get("getDetailedInfo", False) and profiles:
-                    max_detailed = min(len(profiles), args.get("maxDetailedProfiles", 5))
+                if action == "search":
+                    # Search for profiles
+                    driver = governor.check()
+                    facet_lookup = FacetLookup(args.get("facetLookupPath"), resolver=typeahead_resolver(driver))
+                    profiles = search_profiles(
+                        driver, 
+                        args.get("keywords", ""),
+                        args.get("location", ""),
+                        args.get("maxResults", 10),
+                        filters={name: args.get(name) for name in ("currentCompany", "industry", "school", "connectionDegree", "yearsOfExperience")},
+                        facet_lookup=facet_lookup,
+                        script_registry=script_registry,
+                        archive=archive
+                    )
                     
-                    for i in range(max_detailed):
-                        try:
-                            detailed_info = get_profile_details(driver, profiles[i]["profileUrl"])
-                            if detailed_info:
-                                profiles[i]["details"] = detailed_info
-                        except Exception as e:
-                            log(f"Error getting details for profile {i}: {str(e)}")
+                    # Get detailed profile info if requested
+                    max_detailed = args.get("maxDetailedProfiles", 5) if args.get("getDetailedInfo", False) else 0
+                else:
+                    # Enrich a given batch of profile URLs (used by crawl_coordinator.py)
+                    profiles = [{"name": "Unknown", "profileUrl": canonical_profile_url(url), "title": "", "location": ""}
+                                for url in args.get("profileUrls", [])]
+                    max_detailed = len(profiles)
+                
+                # Profiles are streamed as item frames as soon as they are final,
+                # unless they still have to be ranked as a whole
+                rank = args.get("rank", False)
+                emit = None if rank else (lambda profile: channel.item("profiles", profile))
+                if profiles:
+                    try:
+                        enrich_profiles(driver, profiles, max_detailed, profile_index, max_age_seconds, governor, breaker,
+                                        archive, emit)
+                    except CircuitOpenError as e:
+                        # Keep what was scraped so far, but report why the batch stopped
+                        log("Enrichment stopped: %s", e, level="error")
+                        result["error"] = str(e)
+                        result["errorClass"] = e.error_class
+                
+                # Rank by lead score if requested (needs numpy/pandas, so only imported here)
+                if rank and profiles:
+                    from lead_scoring import rank_profiles
+                    profiles = rank_profiles(profiles, weights=args.get("scoringWeights"), targets={
+                        "keywords": args.get("rankKeywords") or args.get("keywords", "").split(),
+                        "companies": args.get("currentCompany"),
+                        "locations": args.get("location"),
+                        "schools": args.get("school")
+                    })
+                    result["profiles"] = profiles
+                else:
+                    # Profiles past maxDetailedProfiles, or left over when the breaker opened, are final as they are
+                    for profile in profiles[channel.streamed.get("profiles", 0):]:
+                        channel.item("profiles", profile)
                 
                 result["success"] = True
-                result["profiles"] = profiles
             
             elif action == "profile":
                 # Check if already logged in or login
@@ -880,29 +1151,35 @@ if __name__ == "__main__":
                     if not login_status:
                         log("Session validation failed: User is not logged in despite skipLogin=true")
                         result["error"] = "Not logged in to LinkedIn. Please log in first or provide credentials."
-                        # Only JSON result should go to stdout
-                        print(json.dumps(result))
-                        driver.quit()
+                        result["errorClass"] = scrape_errors.inspect_page(driver) or scrape_errors.AUTH_LOST
+                        # The finally block below sends the result and quits the driver
                         sys.exit(1)
                 else:
                     # Regular login with credentials
                     login_success = login_linkedin(driver, email, password)
                     if not login_success:
                         result["error"] = "Login failed"
-                        # Only JSON result should go to stdout
-                        print(json.dumps(result))
-                        driver.quit()
+                        result["errorClass"] = scrape_errors.inspect_page(driver) or scrape_errors.AUTH_LOST
+                        # The finally block below sends the result and quits the driver
                         sys.exit(1)
                 
                 # Get profile details
                 profile_url = args.get("profileUrl")
                 if profile_url:
-                    profile_data = get_profile_details(driver, profile_url)
-                    if profile_data:
-                        result["success"] = True
-                        result["profile"] = profile_data
-                    else:
-                        result["error"] = "Failed to get profile details"
+                    profile_data = None
+                    if profile_index and not args.get("refresh", False):
+                        profile_data = profile_index.cached_details(profile_url, max_age_seconds)
+                        if profile_data:
+                            log(f"Using indexed details for known profile: {profile_url}")
+                    if not profile_data:
+                        # Failures raise ScrapeError and are classified in the except below
+                        driver = governor.check()
+                        profile_data = get_profile_details(driver, site_profile_url(profile_url, LINKEDIN_BASE_URL), archive)
+                        if profile_index:
+                            profile_index.upsert({"profileUrl": canonical_profile_url(profile_url), "name": profile_data.get("name")}, profile_data)
+                            profile_index.add_alias(driver.current_url, profile_url)
+                    result["success"] = True
+                    result["profile"] = profile_data
                 else:
                     result["error"] = "No profile URL provided"
             
@@ -910,20 +1187,35 @@ if __name__ == "__main__":
                 result["error"] = f"Unknown action: {action}"
         
         except Exception as e:
-            log(f"Exception in main flow: {str(e)}")
+            log("Exception in main flow: %s", e, level="error")
             result["error"] = str(e)
+            result["errorClass"] = scrape_errors.classify(e, governor.driver)
+            breaker.record_failure(result["errorClass"])
         
         finally:
-            # Output the result as JSON
-            # This is the ONLY thing that should go to stdout
-            print(json.dumps(result))
-            driver.quit()
+            # Drain queued log records first, then send the result frame;
+            # ranked profiles are streamed as item frames here, the others already were
+            result["memory"] = governor.telemetry()
+            result["errorCounts"] = breaker.snapshot()
+            if script_registry and script_registry.stats:
+                result["scriptCalls"] = script_registry.telemetry()
+            if archive:
+                archive.flush()
+                result["archive"] = archive.stats()
+                archive.close()
+            worker_logging.shutdown_logging()
+            channel.result(result, stream_key="profiles")
+            governor.driver.quit()
+            if profile_index:
+                profile_index.close()
     except Exception as e:
         # If driver setup fails, we need to output a valid JSON result
-        log(f"Critical error during driver setup: {str(e)}")
+        log("Critical error during driver setup: %s", e, level="error")
         error_result = {
             "success": False,
-            "error": f"Failed to initialize Chrome driver: {str(e)}"
+            "error": f"Failed to initialize Chrome driver: {str(e)}",
+            "errorClass": scrape_errors.DRIVER_CRASH
         }
-        print(json.dumps(error_result))
+        worker_logging.shutdown_logging()
+        channel.result(error_result)
         sys.exit(1)
\ No newline at end of file
@@ -0,0 +1,280 @@
+#!/usr/bin/env python
+"""
+Multi-process post-processing of scraped profiles.
+
+Profiles stream in from any iterable (a JSONL file, or
+CrawlCoordinator.crawl() while the crawl is still running). They are
+deduplicated by profile key in the parent and grouped into chunks. The chunks
+are then normalized, optionally scored and serialized on a ProcessPoolExecutor.
+Normalizing turns the experience ``duration`` and education ``dates`` strings
+from get_profile_details() into structured dates. At most ``max_in_flight``
+chunks are queued at a time, so the input is only pulled as fast as the
+workers keep up and memory stays bounded however large the crawl is.
+Finished chunks are yielded and written in completion order.
+
+    python post_processing.py <input.jsonl> [--jsonl out.jsonl] [--csv out.csv]
+                              [--score] [--workers N] [--chunk-size N]
+"""
+import argparse
+import concurrent.futures
+import csv
+import io
+import json
+import multiprocessing
+import os
+import re
+import sys
+import time
+from datetime import date
+
+from profile_index import canonical_profile_url, profile_key
+
+MONTHS = {name: index + 1 for index, name in enumerate(
+    ["jan", "feb", "mar", "apr", "may", "jun", "jul", "aug", "sep", "oct", "nov", "dec"])}
+
+_DATE_RE = re.compile(r"(?:\b([a-z]{3})[a-z]*\.?\s+)?(\d{4})\b", re.IGNORECASE)
+_RANGE_SPLIT_RE = re.compile(r"\s+(?:-|–|—|to)\s+", re.IGNORECASE)
+_PRESENT_RE = re.compile(r"\b(?:present|current|now)\b", re.IGNORECASE)
+
+CSV_COLUMNS = ["name", "profileUrl", "title", "location", "headline", "currentTitle", "currentCompany",
+               "careerStart", "experienceMonths", "schools", "score"]
+
+
+def parse_date(text):
+    """Parse 'Jan 2020', 'January 2020' or '2020' into (year, month or None); None if no year."""
+    match = _DATE_RE.search(text or "")
+    if not match:
+        return None
+    month = MONTHS.get((match.group(1) or "").lower())
+    return int(match.group(2)), month
+
+
+def _format_date(parsed):
+    if not parsed:
+        return None
+    year, month = parsed
+    return f"{year:04d}-{month:02d}" if month else f"{year:04d}"
+
+
+def parse_date_range(text, today=None):
+    """
+    Parse a 'Jan 2020 - Present' style range (also '2010 - 2014' or
+    'Mar 2018 - Jun 2021 · 3 yrs 4 mos') into start/end dates, a current flag
+    and an inclusive length in months.
+    """
+    today = today or date.today()
+    # Drop the "· 3 yrs 4 mos" tail LinkedIn appends
+    text = (text or "").split("·")[0].strip()
+    parts = _RANGE_SPLIT_RE.split(text, maxsplit=1)
+    start = parse_date(parts[0])
+    if len(parts) > 1:
+        current = bool(_PRESENT_RE.search(parts[1]))
+        end = None if current else parse_date(parts[1])
+    else:
+        # A lone date ("2019") is a single period, not an open range
+        current = False
+        end = start
+
+    months = None
+    if start:
+        end_year, end_month = (today.year, today.month) if current or not end else end
+        months = (end_year - start[0]) * 12 + (end_month or 12) - (start[1] or 1) + 1
+        months = max(months, 0)
+    return {
+        "start": _format_date(start),
+        "end": _format_date(end),
+        "current": current,
+        "months": months,
+    }
+
+
+def normalize_profile(profile, today=None):
+    """Return a copy of a profile with a canonical URL, its key and structured experience/education dates."""
+    profile = dict(profile)
+    if profile.get("profileUrl"):
+        profile["profileUrl"] = canonical_profile_url(profile["profileUrl"])
+    profile["key"] = profile_key(profile.get("profileUrl"))
+
+    details = profile.get("details")
+    if details:
+        details = dict(details)
+        experience = []
+        for exp in details.get("experience") or []:
+            dates = parse_date_range(exp.get("duration"), today)
+            experience.append(dict(exp, startDate=dates["start"], endDate=dates["end"],
+                                   isCurrent=dates["current"], durationMonths=dates["months"]))
+        education = []
+        for edu in details.get("education") or []:
+            dates = parse_date_range(edu.get("dates"), today)
+            education.append(dict(edu, startYear=int(dates["start"][:4]) if dates["start"] else None,
+                                  endYear=int(dates["end"][:4]) if dates["end"] else None))
+        details["experience"] = experience
+        details["education"] = education
+        profile["details"] = details
+
+        starts = [exp["startDate"] for exp in experience if exp["startDate"]]
+        profile["careerStart"] = min(starts) if starts else None
+        profile["experienceMonths"] = sum(exp["durationMonths"] or 0 for exp in experience)
+        current = next((exp for exp in experience if exp["isCurrent"]), experience[0] if experience else None)
+        if current:
+            profile["currentTitle"] = current.get("title") or ""
+            profile["currentCompany"] = current.get("company") or ""
+    return profile
+
+
+def csv_row(profile):
+    """Flatten a normalized profile into CSV_COLUMNS."""
+    details = profile.get("details") or {}
+    row = {
+        "name": profile.get("name") or details.get("name") or "",
+        "profileUrl": profile.get("profileUrl") or "",
+        "title": profile.get("title") or "",
+        "location": profile.get("location") or details.get("location") or "",
+        "headline": details.get("headline") or "",
+        "currentTitle": profile.get("currentTitle") or "",
+        "currentCompany": profile.get("currentCompany") or "",
+        "careerStart": profile.get("careerStart") or "",
+        "experienceMonths": profile.get("experienceMonths", ""),
+        "schools": " | ".join(edu.get("school") or "" for edu in details.get("education") or []),
+        "score": profile.get("score", ""),
+    }
+    return [row[column] for column in CSV_COLUMNS]
+
+
+def process_chunk(profiles, options):
+    """
+    CPU stage run in a worker process: normalize, optionally score, and
+    pre-serialize the requested output formats for one chunk.
+    """
+    records = [normalize_profile(profile) for profile in profiles]
+    if options.get("score") and records:
+        # Needs numpy/pandas, so only imported when scoring is enabled
+        from lead_scoring import rank_profiles
+        # Scores are absolute per profile, so scoring chunk by chunk matches scoring the whole set
+        records = rank_profiles(records, weights=options.get("weights"), targets=options.get("targets"))
+    outputs = {}
+    if options.get("jsonl"):
+        outputs["jsonl"] = "".join(json.dumps(record) + "\n" for record in records)
+    if options.get("csv"):
+        buffer = io.StringIO()
+        csv.writer(buffer).writerows(csv_row(record) for record in records)
+        outputs["csv"] = buffer.getvalue()
+    return records, outputs
+
+
+def chunked(iterable, size):
+    """Group an iterable into lists of up to size items."""
+    chunk = []
+    for item in iterable:
+        chunk.append(item)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+class Pipeline:
+    """Dedup -> chunk -> normalize/score/serialize on a process pool -> write, with bounded in-flight chunks."""
+
+    def __init__(self, workers=None, chunk_size=100, max_in_flight=None, score=False, weights=None,
+                 targets=None, jsonl_path=None, csv_path=None):
+        self.workers = workers or os.cpu_count() or 1
+        self.chunk_size = max(1, int(chunk_size))
+        # Two chunks per worker keeps every worker busy while the next chunk is being filled
+        self.max_in_flight = max_in_flight or self.workers * 2
+        self.options = {"score": score, "weights": weights, "targets": targets,
+                        "jsonl": bool(jsonl_path), "csv": bool(csv_path)}
+        self.jsonl_path = jsonl_path
+        self.csv_path = csv_path
+        self._seen = set()
+        self.stats = {"received": 0, "duplicates": 0, "processed": 0, "chunks": 0, "waits": 0, "seconds": 0.0}
+
+    def _deduplicated(self, profiles):
+        for profile in profiles:
+            self.stats["received"] += 1
+            key = profile_key(profile.get("profileUrl")) or profile.get("profileUrl")
+            if key in self._seen:
+                self.stats["duplicates"] += 1
+                continue
+            self._seen.add(key)
+            yield profile
+
+    def _open_outputs(self):
+        """Open the output files for appending, like the crawl's JSONL output; new CSV files get a header."""
+        outputs = {}
+        for name, path in (("jsonl", self.jsonl_path), ("csv", self.csv_path)):
+            if not path:
+                continue
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            outputs[name] = open(path, "a", encoding="utf-8", newline="")
+        if "csv" in outputs and outputs["csv"].tell() == 0:
+            csv.writer(outputs["csv"]).writerow(CSV_COLUMNS)
+        return outputs
+
+    def process(self, profiles):
+        """Yield processed profiles as their chunks complete, writing the configured outputs on the way."""
+        started = time.perf_counter()
+        outputs = self._open_outputs()
+        # spawn rather than fork: the coordinator feeding us runs threads and subprocesses
+        context = multiprocessing.get_context("spawn")
+        try:
+            with concurrent.futures.ProcessPoolExecutor(self.workers, mp_context=context) as pool:
+                in_flight = set()
+                for chunk in chunked(self._deduplicated(profiles), self.chunk_size):
+                    if len(in_flight) >= self.max_in_flight:
+                        # Back-pressure: stop pulling input until a chunk finishes
+                        self.stats["waits"] += 1
+                        done, in_flight = concurrent.futures.wait(
+                            in_flight, return_when=concurrent.futures.FIRST_COMPLETED)
+                        yield from self._collect(done, outputs)
+                    in_flight.add(pool.submit(process_chunk, chunk, self.options))
+                    self.stats["chunks"] += 1
+                    # Pick up anything that finished while the chunk was filling
+                    done = {future for future in in_flight if future.done()}
+                    in_flight -= done
+                    yield from self._collect(done, outputs)
+                for future in concurrent.futures.as_completed(in_flight):
+                    yield from self._collect([future], outputs)
+        finally:
+            for output in outputs.values():
+                output.close()
+            self.stats["seconds"] = round(time.perf_counter() - started, 3)
+
+    def _collect(self, futures, outputs):
+        for future in futures:
+            records, serialized = future.result()
+            for name, text in serialized.items():
+                outputs[name].write(text)
+            self.stats["processed"] += len(records)
+            yield from records
+
+
+def read_jsonl(path):
+    """Yield records from a JSONL file, skipping blank and malformed lines."""
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield json.loads(line)
+            except ValueError:
+                continue
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Normalize, deduplicate, score and export scraped profiles.")
+    parser.add_argument("input", help="JSONL file of profiles, e.g. a crawl_coordinator output")
+    parser.add_argument("--jsonl", help="write processed profiles as JSONL")
+    parser.add_argument("--csv", help="write processed profiles as CSV")
+    parser.add_argument("--score", action="store_true", help="attach lead scores (needs numpy and pandas)")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--chunk-size", type=int, default=100)
+    cli = parser.parse_args()
+
+    pipeline = Pipeline(workers=cli.workers, chunk_size=cli.chunk_size, score=cli.score,
+                        jsonl_path=cli.jsonl, csv_path=cli.csv)
+    for _ in pipeline.process(read_jsonl(cli.input)):
+        pass
+    print(json.dumps(pipeline.stats), file=sys.stderr)
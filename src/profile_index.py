@@ -0,0 +1,343 @@
+#!/usr/bin/env python
+"""
+Persistent profile identity index shared by all scraper actions.
+
+LinkedIn exposes the same person under many URL shapes (tracking query
+strings, trailing slashes, locale subdomains and subpaths, vanity names and
+opaque ``ACoAA...`` profile ids, ``urn:li:member:`` URNs).  Everything is
+reduced to a canonical key here so a profile is only enriched once, no matter
+which query or action surfaced it.
+
+The same database keeps an FTS5 full-text index over everything that was
+scraped (name, headline, title, location, about, experience titles and
+companies, schools). It is updated with every upsert and backs the
+``local_search`` action, which answers lookups without a browser.
+"""
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from urllib.parse import quote, unquote, urlparse
+
+CANONICAL_PROFILE_BASE = "https://www.linkedin.com/in/"
+
+# Opaque profile ids are case sensitive, vanity names are not
+_PROFILE_ID_RE = re.compile(r"^(ACo|AEM)[A-Za-z0-9_-]{10,}$")
+_URN_RE = re.compile(r"urn:li:(?:fs_|fsd_)?(member|profile|miniProfile)[:(]([A-Za-z0-9_-]+)", re.IGNORECASE)
+
+# Full-text columns and their bm25 weights (the leading key column is unindexed)
+FTS_COLUMNS = ["name", "headline", "title", "location", "about", "experience", "companies", "schools"]
+FTS_WEIGHTS = [0.0, 10.0, 5.0, 5.0, 2.0, 1.0, 2.0, 3.0, 1.0]
+
+# local_search filter name -> FTS columns it is matched against
+SEARCH_FILTER_COLUMNS = {
+    "name": ["name"],
+    "title": ["title", "headline", "experience"],
+    "location": ["location"],
+    "company": ["companies", "title", "headline"],
+    "school": ["schools"],
+}
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def _profile_slug(value):
+    """Return the identifying slug of a profile URL or URN, or None."""
+    if not value:
+        return None
+    value = unquote(str(value).strip())
+
+    # The /in/ path wins over URNs in the query string (search cards link /in/<vanity>/?miniProfileUrn=...)
+    if not value.lower().startswith("urn:"):
+        url = value if "://" in value or value.startswith("/") else "https://" + value
+        # /in/<slug>/[locale/][overlay/...]
+        parts = [p for p in urlparse(url).path.split("/") if p]
+        if "in" in parts:
+            index = parts.index("in")
+            return parts[index + 1] if index + 1 < len(parts) else None
+
+    urn_match = _URN_RE.search(value)
+    if urn_match:
+        kind, ident = urn_match.groups()
+        if kind.lower() == "member":
+            return f"member:{ident}"
+        return ident
+    return None
+
+
+def profile_key(value):
+    """
+    Return the canonical identity key for a profile URL or URN.
+    Vanity names are lower-cased, opaque ids keep their case.
+    """
+    slug = _profile_slug(value)
+    if not slug:
+        return None
+    if slug.startswith("member:"):
+        return f"urn:{slug}"
+    if _PROFILE_ID_RE.match(slug):
+        return f"urn:{slug}"
+    return f"in:{slug.lower()}"
+
+
+def canonical_profile_url(value):
+    """Return the canonical https://www.linkedin.com/in/<slug>/ form of a profile URL."""
+    slug = _profile_slug(value)
+    if not slug or slug.startswith("member:"):
+        return value.split("?")[0] if value else value
+    if not _PROFILE_ID_RE.match(slug):
+        slug = slug.lower()
+    return f"{CANONICAL_PROFILE_BASE}{quote(slug)}/"
+
+
+def site_profile_url(value, base_url):
+    """
+    Return the URL to navigate to for a profile on base_url. Identity stays on
+    the canonical linkedin.com form; only navigation follows baseUrl, so the
+    workers can run against a stand-in server.
+    """
+    url = canonical_profile_url(value)
+    if not url or not url.startswith(CANONICAL_PROFILE_BASE):
+        return url
+    return f"{base_url.rstrip('/')}/in/{url[len(CANONICAL_PROFILE_BASE):]}"
+
+
+class ProfileIndex:
+    """SQLite backed set of known profiles with alias resolution and cached details."""
+
+    def __init__(self, db_path):
+        directory = os.path.dirname(os.path.abspath(db_path))
+        os.makedirs(directory, exist_ok=True)
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS profiles (
+                key TEXT PRIMARY KEY,
+                url TEXT NOT NULL,
+                name TEXT,
+                title TEXT,
+                location TEXT,
+                details TEXT,
+                first_seen REAL NOT NULL,
+                last_seen REAL NOT NULL,
+                enriched_at REAL
+            );
+            CREATE TABLE IF NOT EXISTS aliases (
+                alias TEXT PRIMARY KEY,
+                key TEXT NOT NULL
+            );
+        """)
+        self.fts_enabled = self._create_fts()
+        self._conn.commit()
+
+    def _create_fts(self):
+        """Create the full-text table, backfilling it for databases created before it existed."""
+        exists = self._conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE name = 'profiles_fts'"
+        ).fetchone()
+        if exists:
+            return True
+        try:
+            self._conn.execute(
+                f"CREATE VIRTUAL TABLE profiles_fts USING fts5(key UNINDEXED, {', '.join(FTS_COLUMNS)}, "
+                "tokenize = 'unicode61 remove_diacritics 2')"
+            )
+        except sqlite3.OperationalError:
+            # SQLite built without FTS5
+            return False
+        keys = [row[0] for row in self._conn.execute("SELECT key FROM profiles")]
+        for key in keys:
+            self._index_text(key)
+        return True
+
+    def _index_text(self, key):
+        """Rebuild the full-text row of a profile from its merged stored record. Caller holds the lock."""
+        row = self._conn.execute(
+            "SELECT name, title, location, details FROM profiles WHERE key = ?", (key,)
+        ).fetchone()
+        if not row:
+            return
+        name, title, location, details_json = row
+        details = json.loads(details_json) if details_json else {}
+        experience = details.get("experience") or []
+        education = details.get("education") or []
+        values = [
+            name if name and name != "Unknown" else (details.get("name") or ""),
+            details.get("headline") or "",
+            title or "",
+            location or details.get("location") or "",
+            details.get("about") or "",
+            " | ".join(exp.get("title") or "" for exp in experience),
+            " | ".join(exp.get("company") or "" for exp in experience),
+            " | ".join(edu.get("school") or "" for edu in education),
+        ]
+        self._conn.execute("DELETE FROM profiles_fts WHERE key = ?", (key,))
+        self._conn.execute(
+            f"INSERT INTO profiles_fts (key, {', '.join(FTS_COLUMNS)}) VALUES (?{', ?' * len(FTS_COLUMNS)})",
+            [key] + [str(v) for v in values]
+        )
+
+    def resolve(self, value):
+        """Return the primary key a URL/URN maps to, following aliases."""
+        key = profile_key(value)
+        if not key:
+            return None
+        with self._lock:
+            row = self._conn.execute("SELECT key FROM aliases WHERE alias = ?", (key,)).fetchone()
+        return row[0] if row else key
+
+    def add_alias(self, alias_value, primary_value):
+        """Record that two URL/URN variants identify the same person."""
+        alias = profile_key(alias_value)
+        primary = self.resolve(primary_value)
+        if not alias or not primary or alias == primary:
+            return
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO aliases (alias, key) VALUES (?, ?)", (alias, primary)
+            )
+            self._conn.commit()
+
+    def contains(self, value):
+        """Check whether a profile is already known."""
+        return self.get(value) is not None
+
+    def get(self, value):
+        """Return the stored record for a profile, or None."""
+        key = self.resolve(value)
+        if not key:
+            return None
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT key, url, name, title, location, details, first_seen, last_seen, enriched_at "
+                "FROM profiles WHERE key = ?", (key,)
+            ).fetchone()
+        if not row:
+            return None
+        return {
+            "key": row[0],
+            "profileUrl": row[1],
+            "name": row[2],
+            "title": row[3],
+            "location": row[4],
+            "details": json.loads(row[5]) if row[5] else None,
+            "firstSeen": row[6],
+            "lastSeen": row[7],
+            "enrichedAt": row[8],
+        }
+
+    def cached_details(self, value, max_age_seconds=None):
+        """Return stored details if the profile was enriched recently enough."""
+        record = self.get(value)
+        if not record or not record["details"]:
+            return None
+        if max_age_seconds is not None and time.time() - (record["enrichedAt"] or 0) > max_age_seconds:
+            return None
+        return record["details"]
+
+    def upsert(self, profile, details=None):
+        """Insert or merge a search result (and optionally its details) into the index."""
+        key = self.resolve(profile.get("profileUrl"))
+        if not key:
+            return None
+        now = time.time()
+        details_json = json.dumps(details) if details else None
+        with self._lock:
+            self._conn.execute("""
+                INSERT INTO profiles (key, url, name, title, location, details, first_seen, last_seen, enriched_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(key) DO UPDATE SET
+                    name = COALESCE(NULLIF(excluded.name, 'Unknown'), profiles.name),
+                    title = COALESCE(NULLIF(excluded.title, ''), profiles.title),
+                    location = COALESCE(NULLIF(excluded.location, ''), profiles.location),
+                    details = COALESCE(excluded.details, profiles.details),
+                    enriched_at = COALESCE(excluded.enriched_at, profiles.enriched_at),
+                    last_seen = excluded.last_seen
+            """, (
+                key,
+                canonical_profile_url(profile.get("profileUrl")),
+                profile.get("name"),
+                profile.get("title", ""),
+                profile.get("location", ""),
+                details_json,
+                now,
+                now,
+                now if details else None,
+            ))
+            if self.fts_enabled:
+                self._index_text(key)
+            self._conn.commit()
+        return key
+
+    @staticmethod
+    def _match_expression(text, columns=None):
+        """Turn free text into an FTS5 expression of prefix terms, optionally scoped to columns."""
+        tokens = _TOKEN_RE.findall(text or "")
+        if not tokens:
+            return None
+        expression = " AND ".join(f'"{token}"*' for token in tokens)
+        if columns:
+            return f"{{{' '.join(columns)}}} : ({expression})"
+        return f"({expression})"
+
+    def search(self, query="", filters=None, enriched_only=False, limit=20):
+        """
+        Full-text search over indexed profiles, best bm25 match first.
+        filters maps SEARCH_FILTER_COLUMNS keys (title, location, company, school, name) to text.
+        """
+        if not self.fts_enabled:
+            raise RuntimeError("SQLite FTS5 is not available; local search is disabled")
+
+        clauses = []
+        free_text = self._match_expression(query)
+        if free_text:
+            clauses.append(free_text)
+        for name, value in (filters or {}).items():
+            if name not in SEARCH_FILTER_COLUMNS:
+                raise ValueError(f"Unknown local search filter: {name}")
+            expression = self._match_expression(value, SEARCH_FILTER_COLUMNS[name])
+            if expression:
+                clauses.append(expression)
+
+        sql = (
+            "SELECT p.key, p.url, p.name, p.title, p.location, p.details, p.enriched_at, "
+            "bm25(profiles_fts, " + ", ".join(str(w) for w in FTS_WEIGHTS) + ") AS score, "
+            "snippet(profiles_fts, -1, '[', ']', '...', 12) "
+            "FROM profiles_fts JOIN profiles p ON p.key = profiles_fts.key"
+        )
+        params = []
+        if clauses:
+            sql += " WHERE profiles_fts MATCH ?"
+            params.append(" AND ".join(clauses))
+        if enriched_only:
+            sql += (" AND" if clauses else " WHERE") + " p.details IS NOT NULL"
+        sql += " ORDER BY score LIMIT ?" if clauses else " ORDER BY p.last_seen DESC LIMIT ?"
+        params.append(int(limit))
+
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        results = []
+        for key, url, name, title, location, details_json, enriched_at, score, snippet in rows:
+            details = json.loads(details_json) if details_json else None
+            results.append({
+                "name": name if name and name != "Unknown" else (details or {}).get("name") or name,
+                "profileUrl": url,
+                "title": title,
+                "location": location,
+                "details": details,
+                "enrichedAt": enriched_at,
+                # bm25 is lower-is-better; flip it so higher means more relevant
+                "relevance": round(-score, 6) if clauses else None,
+                "snippet": snippet if clauses else None,
+            })
+        return results
+
+    def close(self):
+        """Close the underlying database connection."""
+        with self._lock:
+            self._conn.close()
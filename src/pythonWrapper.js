@@ -1,11 +1,16 @@
 const { PythonShell } = require('python-shell');
+const EventEmitter = require('events');
 const path = require('path');
 const config = require('../config/config');
 
-class LinkedInPythonScraper {
+class LinkedInPythonScraper extends EventEmitter {
   constructor() {
+    super();
     this.pythonScriptPath = path.join(__dirname, 'linkedin_scraper_script.py');
+    this.coordinatorScriptPath = path.join(__dirname, 'crawl_coordinator.py');
     this.userDataDir = path.join(__dirname, '../user_data');
+    this.profileIndexPath = path.join(__dirname, '../data/profile_index.db');
+    this.facetLookupPath = path.join(__dirname, '../data/facet_urns.json');
     this.isInitialized = false;
   }
 
@@ -69,17 +74,27 @@ class LinkedInPythonScraper {
         skipLogin: true, // Use existing session
         headless: config.browser.headless || false,
         userDataDir: this.userDataDir,
+        profileIndexPath: this.profileIndexPath,
+        facetLookupPath: this.facetLookupPath,
         keywords: filters.keywords || '',
         location: filters.location || '',
+        currentCompany: filters.currentCompany || '',
+        industry: filters.industry || '',
+        school: filters.school || '',
+        connectionDegree: filters.connectionDegree || '',
+        yearsOfExperience: filters.yearsOfExperience || '',
         maxResults: filters.maxResults || 20,
         getDetailedInfo: filters.getDetailedInfo === undefined ? true : filters.getDetailedInfo,
-        maxDetailedProfiles: filters.maxDetailedProfiles || 5
-      });
+        maxDetailedProfiles: filters.maxDetailedProfiles || 5,
+        rank: filters.rank || false,
+        scoringWeights: filters.scoringWeights
+      }, this.pythonScriptPath, { collect: true });
 
-      return result.profiles || [];
+      // An empty list now always means "no results"; failures are thrown with their errorClass
+      return this.checkResult(result).profiles || [];
     } catch (error) {
       console.error('Search error:', error);
-      return [];
+      throw error;
     }
   }
 
@@ -99,46 +114,161 @@ class LinkedInPythonScraper {
         skipLogin: true, // Use existing session
         headless: config.browser.headless || false,
         userDataDir: this.userDataDir,
+        profileIndexPath: this.profileIndexPath,
         profileUrl: profileUrl
       });
 
-      return result.profile || null;
+      return this.checkResult(result).profile || null;
     } catch (error) {
       console.error('Profile details error:', error);
-      return null;
+      throw error;
+    }
+  }
+
+  /**
+   * Throw failed results as errors carrying the worker's error class
+   * (auth_lost, checkpoint, structure_changed, timeout, rate_limited, driver_crash, unknown).
+   * A result can be successful and still carry an error: the circuit breaker
+   * stopped enrichment part way. That is thrown too, with the partial result
+   * attached as error.result.
+   */
+  checkResult(result) {
+    // A lost session needs a fresh login before the next call, also when it only
+    // showed up as a per-profile detailsError (those are counted by the breaker)
+    const failures = (result.errorCounts && result.errorCounts.failures) || {};
+    if (['auth_lost', 'checkpoint'].some((errorClass) => result.errorClass === errorClass || failures[errorClass])) {
+      this.isInitialized = false;
+    }
+
+    if (result.success && !result.error && !result.errorClass) {
+      return result;
+    }
+
+    const error = new Error(result.error || 'Python script failed');
+    error.errorClass = result.errorClass || 'unknown';
+    error.errorCounts = result.errorCounts;
+    if (result.success) {
+      error.result = result;
+    }
+    throw error;
+  }
+
+  /**
+   * Query the local index of previously scraped profiles (no browser, no login)
+   */
+  async localSearch(query, filters = {}) {
+    try {
+      const result = await this.runPythonScript({
+        action: 'local_search',
+        profileIndexPath: this.profileIndexPath,
+        query: query || '',
+        name: filters.name || '',
+        title: filters.title || '',
+        location: filters.location || '',
+        company: filters.company || filters.currentCompany || '',
+        school: filters.school || '',
+        enrichedOnly: filters.enrichedOnly || false,
+        maxResults: filters.maxResults || 20
+      }, this.pythonScriptPath, { collect: true });
+
+      // A missing index or SQLite without FTS5 is an error, not "no matches"
+      return this.checkResult(result).profiles || [];
+    } catch (error) {
+      console.error('Local search error:', error);
+      throw error;
     }
   }
 
   /**
-   * Run the Python script with given arguments
+   * Crawl queries and profiles sharded across several accounts.
+   * Each account gets its own session directory and profile index under data/shards;
+   * merged profiles are emitted as 'item' events while the crawl runs and are only
+   * collected into result.profiles with collect: true.
+   * postProcess ({ workers, chunkSize, score, weights, targets, csv }) normalizes,
+   * scores and exports the merged stream on a process pool as it arrives.
    */
-  async runPythonScript(args) {
+  async crawl({ accounts, queries = [], profiles = [], enrich = true, batchSize = 20, output, postProcess, collect = false }) {
+    const result = await this.runPythonScript({
+      accounts,
+      queries,
+      profiles,
+      enrich,
+      batchSize,
+      output,
+      postProcess,
+      dataDir: path.join(__dirname, '../data/shards'),
+      workerArgs: {
+        headless: config.browser.headless || false,
+        ...config.python.memory
+      }
+    }, this.coordinatorScriptPath, { collect });
+
+    return this.checkResult(result);
+  }
+
+  /**
+   * Run the Python script with given arguments.
+   *
+   * The script writes one typed JSON frame per stdout line (see ipc.py):
+   * `item` frames carry records as soon as they are final and are re-emitted as
+   * 'item' events, `log` frames are already filtered by level, `progress`/`metric`
+   * frames are re-emitted as events on this instance, and the final `result`
+   * frame closes the exchange. With collect, streamed records are also gathered
+   * back into their collection on the result; otherwise the result only carries
+   * their counts in `streamed`.
+   */
+  async runPythonScript(args, scriptPath = this.pythonScriptPath, { collect = false } = {}) {
     return new Promise((resolve, reject) => {
       // Configure PythonShell options
       const options = {
-        mode: 'json',        // Expect JSON output
+        mode: 'json',        // One JSON frame per line
         pythonPath: 'python', // Use system Python
         pythonOptions: ['-u'], // unbuffered output
-        scriptPath: path.dirname(this.pythonScriptPath),
+        scriptPath: path.dirname(scriptPath),
         args: []
       };
 
       // Create a new PythonShell instance
-      const pyshell = new PythonShell(path.basename(this.pythonScriptPath), options);
+      const pyshell = new PythonShell(path.basename(scriptPath), options);
 
       // Send the arguments to the Python script
-      pyshell.send(args);
+      pyshell.send({ logLevel: config.python.logLevel, ...config.python.memory, ...config.python.archive, ...args });
 
       let result = null;
+      const streamed = {};
 
-      // Handle messages from the Python script (valid JSON)
+      // Dispatch framed messages from the Python script
       pyshell.on('message', (message) => {
-        result = message;
+        switch (message && message.type) {
+          case 'item':
+            if (collect) {
+              (streamed[message.data.collection] = streamed[message.data.collection] || []).push(message.data.record);
+            }
+            this.emit('item', message.data);
+            break;
+          case 'log':
+            console.log(
+              `Python ${message.data.level}:`,
+              message.data.message,
+              message.data.suppressed ? `(${message.data.suppressed} similar messages suppressed)` : ''
+            );
+            break;
+          case 'progress':
+          case 'metric':
+            this.emit(message.type, message.data);
+            break;
+          case 'result':
+            result = message.data;
+            break;
+          default:
+            // Unframed output from an older script version
+            result = message;
+        }
       });
 
-      // Handle errors and debug logs from Python (these will go to stderr)
+      // Only uncaught tracebacks and native library output reach stderr now
       pyshell.on('stderr', (err) => {
-        console.log('Python log:', err);  // Changed from error to log since we're using stderr for logging
+        console.log('Python stderr:', err);
       });
 
       // Handle Python errors
@@ -148,14 +278,17 @@ class LinkedInPythonScraper {
 
       // End the Python process and resolve/reject based on the result
       pyshell.end((err) => {
-        if (err) {
-          // Parsing errors are common when mixing logs with JSON output
-          if (err.message && err.message.includes('Unexpected token')) {
-            console.error('JSON parsing error from Python output. Check Python logging.');
-          } else {
-            console.error('Python script error:', err);
+        if (result && collect) {
+          // Reassemble collections that were streamed as item frames
+          for (const [collection, records] of Object.entries(streamed)) {
+            result[collection] = records;
           }
-          
+          delete result.streamed;
+        }
+
+        if (err) {
+          console.error('Python script error:', err);
+
           // If we got a result object despite the error, return it
           if (result) {
             resolve(result);
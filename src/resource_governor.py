@@ -0,0 +1,159 @@
+#!/usr/bin/env python
+"""
+Memory governor for long-lived Chrome drivers created by setup_driver().
+
+Chrome's memory grows as a single tab keeps navigating between search and
+profile pages. The governor samples the page's JS heap through CDP
+``Performance.getMetrics`` and the browser's resident set size, opens a fresh
+tab when the heap crosses a soft limit and restarts the driver (carrying the
+session cookies over) when a hard limit is crossed.
+"""
+import time
+
+import ipc
+
+try:
+    import psutil
+except ImportError:  # RSS sampling is skipped without psutil
+    psutil = None
+
+MB = 1024 * 1024
+
+
+class ResourceGovernor:
+    """Samples browser memory and recycles the tab or driver past configured thresholds."""
+
+    def __init__(self, driver_factory, driver=None, prepare_tab=None, tab_recycle_heap_mb=512,
+                 max_heap_mb=1024, max_rss_mb=3072, check_every=1, home_url="https://www.linkedin.com/"):
+        self.driver_factory = driver_factory
+        # Init scripts are registered per tab, so new tabs need them installed again
+        self.prepare_tab = prepare_tab
+        self.driver = driver or driver_factory()
+        self.tab_recycle_heap_mb = tab_recycle_heap_mb
+        self.max_heap_mb = max_heap_mb
+        self.max_rss_mb = max_rss_mb
+        self.check_every = max(1, int(check_every))
+        self.home_url = home_url
+        self.started_at = time.time()
+        self.checks = 0
+        self.tab_recycles = 0
+        self.driver_restarts = 0
+        self.last_sample = {}
+        self.peak = {"jsHeapUsedMb": 0.0, "rssMb": 0.0}
+        self._metrics_enabled = False
+
+    def _browser_rss_mb(self):
+        """Sum the RSS of chromedriver and every Chrome process below it."""
+        if psutil is None:
+            return None
+        try:
+            root = psutil.Process(self.driver.service.process.pid)
+            processes = [root] + root.children(recursive=True)
+            total = 0
+            for process in processes:
+                try:
+                    total += process.memory_info().rss
+                except psutil.Error:
+                    pass
+            return total / MB
+        except Exception:
+            return None
+
+    def sample(self):
+        """Collect a memory sample for the current tab and browser."""
+        sample = {"time": time.time()}
+        try:
+            if not self._metrics_enabled:
+                self.driver.execute_cdp_cmd("Performance.enable", {})
+                self._metrics_enabled = True
+            metrics = self.driver.execute_cdp_cmd("Performance.getMetrics", {})
+            values = {m["name"]: m["value"] for m in metrics.get("metrics", [])}
+            sample["jsHeapUsedMb"] = values.get("JSHeapUsedSize", 0) / MB
+            sample["jsHeapTotalMb"] = values.get("JSHeapTotalSize", 0) / MB
+            sample["documents"] = int(values.get("Documents", 0))
+            sample["nodes"] = int(values.get("Nodes", 0))
+            sample["jsEventListeners"] = int(values.get("JSEventListeners", 0))
+        except Exception:
+            self._metrics_enabled = False
+
+        rss = self._browser_rss_mb()
+        if rss is not None:
+            sample["rssMb"] = rss
+
+        for key in self.peak:
+            if sample.get(key) is not None:
+                self.peak[key] = max(self.peak[key], sample[key])
+        self.last_sample = sample
+        ipc.metric("browser_memory", sample.get("jsHeapUsedMb"), **sample)
+        return sample
+
+    def check(self):
+        """
+        Sample (every check_every calls) and act on the thresholds.
+        Returns the driver to use from now on, which changes after a restart.
+        """
+        self.checks += 1
+        if self.checks % self.check_every:
+            return self.driver
+
+        sample = self.sample()
+        heap = sample.get("jsHeapUsedMb") or 0
+        rss = sample.get("rssMb") or 0
+
+        if (self.max_heap_mb and heap > self.max_heap_mb) or (self.max_rss_mb and rss > self.max_rss_mb):
+            self.restart_driver()
+        elif self.tab_recycle_heap_mb and heap > self.tab_recycle_heap_mb:
+            self.recycle_tab()
+        return self.driver
+
+    def recycle_tab(self):
+        """Replace the current tab with a fresh one in the same browser."""
+        old_handle = self.driver.current_window_handle
+        self.driver.switch_to.new_window("tab")
+        new_handle = self.driver.current_window_handle
+        self.driver.switch_to.window(old_handle)
+        self.driver.close()
+        self.driver.switch_to.window(new_handle)
+        if self.prepare_tab:
+            self.prepare_tab(self.driver)
+        self._metrics_enabled = False
+        self.tab_recycles += 1
+        ipc.metric("tab_recycled", self.tab_recycles)
+
+    def restart_driver(self):
+        """Quit and recreate the driver, restoring the session cookies."""
+        cookies = []
+        try:
+            cookies = self.driver.get_cookies()
+        except Exception:
+            pass
+        try:
+            self.driver.quit()
+        except Exception:
+            pass
+
+        self.driver = self.driver_factory()
+        self._metrics_enabled = False
+        if cookies:
+            # Cookies can only be set for the domain of the current page
+            self.driver.get(self.home_url)
+            for cookie in cookies:
+                if cookie.get("sameSite") not in ("Strict", "Lax", "None"):
+                    cookie.pop("sameSite", None)
+                try:
+                    self.driver.add_cookie(cookie)
+                except Exception:
+                    pass
+        self.driver_restarts += 1
+        ipc.metric("driver_restarted", self.driver_restarts)
+
+    def telemetry(self):
+        """Return counters and the latest/peak samples for the result payload."""
+        return {
+            "uptimeSeconds": round(time.time() - self.started_at, 1),
+            "checks": self.checks,
+            "tabRecycles": self.tab_recycles,
+            "driverRestarts": self.driver_restarts,
+            "last": self.last_sample,
+            "peak": self.peak,
+        }
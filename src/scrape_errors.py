@@ -0,0 +1,165 @@
+#!/usr/bin/env python
+"""
+Error taxonomy and circuit breaker for the scraping pipeline.
+
+Every failure is reduced to one error class so the JSON result can tell
+"no results" apart from "session expired" or "page structure changed", and
+a CircuitBreaker stops (or pauses) a worker once one class keeps failing
+instead of burning the rest of the batch on a broken session.
+"""
+import re
+import time
+
+AUTH_LOST = "auth_lost"
+CHECKPOINT = "checkpoint"
+STRUCTURE_CHANGED = "structure_changed"
+TIMEOUT = "timeout"
+RATE_LIMITED = "rate_limited"
+DRIVER_CRASH = "driver_crash"
+UNKNOWN = "unknown"
+
+ERROR_CLASSES = (AUTH_LOST, CHECKPOINT, STRUCTURE_CHANGED, TIMEOUT, RATE_LIMITED, DRIVER_CRASH, UNKNOWN)
+
+# Consecutive failures of a class before the breaker opens
+DEFAULT_THRESHOLDS = {
+    AUTH_LOST: 1,
+    CHECKPOINT: 1,
+    DRIVER_CRASH: 2,
+    STRUCTURE_CHANGED: 3,
+    RATE_LIMITED: 2,
+    TIMEOUT: 3,
+    UNKNOWN: 5,
+}
+
+# Classes that can recover on their own: the breaker pauses for this many
+# seconds and lets one attempt through. Everything else stops the worker.
+DEFAULT_PAUSES = {
+    RATE_LIMITED: 300,
+    TIMEOUT: 30,
+}
+
+_AUTH_URL_MARKERS = ("/login", "/authwall", "/uas/login", "/signup")
+_CHECKPOINT_URL_MARKERS = ("/checkpoint", "/add-phone", "/challenge")
+# Page titles are short, so a bare 429 there is a status code
+_RATE_LIMIT_TITLE_RE = re.compile(r"\b429\b|too many requests|rate limit|unusual activity")
+# Exception text carries stack addresses, profile ids and URLs, so 429 only counts next to a status word
+_RATE_LIMIT_MESSAGE_RE = re.compile(
+    r"too many requests|rate limit|unusual activity|\b(?:http|status|code|error)\W{0,3}429\b"
+)
+_DRIVER_CRASH_MARKERS = (
+    "invalid session id", "chrome not reachable", "disconnected", "session deleted",
+    "target window already closed", "no such window", "connection refused", "tab crashed",
+)
+
+
+class ScrapeError(Exception):
+    """A failure with an error class from ERROR_CLASSES."""
+
+    def __init__(self, message, error_class=UNKNOWN, url=None):
+        super().__init__(message)
+        self.error_class = error_class
+        self.url = url
+
+
+class CircuitOpenError(ScrapeError):
+    """Raised when the breaker refuses work after repeated failures of one class."""
+
+
+def inspect_page(driver):
+    """Classify the page the driver is on, or return None if it looks like a normal page."""
+    try:
+        url = (driver.current_url or "").lower()
+        title = (driver.title or "").lower()
+    except Exception as e:
+        return classify(e)
+    if any(marker in url for marker in _CHECKPOINT_URL_MARKERS):
+        return CHECKPOINT
+    if any(marker in url for marker in _AUTH_URL_MARKERS):
+        return AUTH_LOST
+    if _RATE_LIMIT_TITLE_RE.search(title):
+        return RATE_LIMITED
+    return None
+
+
+def classify(exc, driver=None):
+    """Map an exception (and, when given, the driver's current page) to an error class."""
+    if isinstance(exc, ScrapeError):
+        return exc.error_class
+
+    name = type(exc).__name__
+    message = str(exc).lower()
+    if name in ("InvalidSessionIdException", "NoSuchWindowException") or any(
+            marker in message for marker in _DRIVER_CRASH_MARKERS):
+        return DRIVER_CRASH
+
+    # Landing on a login or checkpoint page explains most other failures
+    if driver is not None:
+        page_class = inspect_page(driver)
+        if page_class:
+            return page_class
+
+    if name == "TimeoutException" or isinstance(exc, TimeoutError):
+        return TIMEOUT
+    if name in ("NoSuchElementException", "StaleElementReferenceException", "InvalidSelectorException"):
+        return STRUCTURE_CHANGED
+    if _RATE_LIMIT_MESSAGE_RE.search(message):
+        return RATE_LIMITED
+    return UNKNOWN
+
+
+class CircuitBreaker:
+    """
+    Counts failures per error class. After thresholds[cls] consecutive
+    failures of a class the breaker opens: pausable classes block until their
+    pause has elapsed and then allow one trial call, the rest stop the worker.
+    """
+
+    def __init__(self, thresholds=None, pauses=None, sleep=time.sleep):
+        self.thresholds = dict(DEFAULT_THRESHOLDS, **(thresholds or {}))
+        self.pauses = dict(DEFAULT_PAUSES, **(pauses or {}))
+        self.sleep = sleep
+        self.counts = {cls: 0 for cls in ERROR_CLASSES}
+        self.consecutive = {cls: 0 for cls in ERROR_CLASSES}
+        self.successes = 0
+        self.open_class = None
+        self.pauses_taken = 0
+
+    def record_success(self):
+        """Reset the consecutive counters after a successful call."""
+        self.successes += 1
+        self.consecutive = {cls: 0 for cls in ERROR_CLASSES}
+        self.open_class = None
+
+    def record_failure(self, error_class):
+        """Count a failure and open the breaker if its class crossed the threshold."""
+        error_class = error_class if error_class in self.counts else UNKNOWN
+        self.counts[error_class] += 1
+        self.consecutive[error_class] += 1
+        if self.consecutive[error_class] >= self.thresholds.get(error_class, 1):
+            self.open_class = error_class
+        return error_class
+
+    def before_call(self):
+        """Raise CircuitOpenError if work must stop; sleep first if the open class is pausable."""
+        if self.open_class is None:
+            return
+        pause = self.pauses.get(self.open_class)
+        if pause is None:
+            raise CircuitOpenError(
+                f"Stopped after {self.consecutive[self.open_class]} consecutive '{self.open_class}' failures",
+                self.open_class,
+            )
+        self.sleep(pause)
+        self.pauses_taken += 1
+        # Half-open: one more failure of the same class reopens it immediately
+        self.consecutive[self.open_class] = self.thresholds.get(self.open_class, 1) - 1
+        self.open_class = None
+
+    def snapshot(self):
+        """Counters for the JSON result."""
+        return {
+            "failures": {cls: count for cls, count in self.counts.items() if count},
+            "successes": self.successes,
+            "open": self.open_class,
+            "pauses": self.pauses_taken,
+        }
@@ -0,0 +1,100 @@
+#!/usr/bin/env python
+"""
+Registry for JS extraction bundles injected once per document.
+
+The bundle source is read and versioned once per process and registered per
+tab with CDP ``Page.addScriptToEvaluateOnNewDocument`` (the same mechanism
+setup_driver() uses for its init script), so every page the tab loads already
+has ``window.__extract``. A call then only sends the function name and its
+config. If the bundle is missing when called (the page was loaded before
+registration, or navigation replaced the document mid-call) it is evaluated
+into the current document and the call retried once.
+"""
+import hashlib
+import json
+import os
+import time
+
+import ipc
+
+BUNDLE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+_CALL_SCRIPT = (
+    "const ns = window[arguments[0]];"
+    "if (!ns || ns.version !== arguments[1]) { return {__missing: true}; }"
+    "return {value: ns[arguments[2]](arguments[3])};"
+)
+
+
+class ScriptRegistry:
+    """Installs a bundle per tab and invokes its functions with per-call metrics."""
+
+    def __init__(self, bundle_path=None, namespace="__extract"):
+        self.bundle_path = bundle_path or os.path.join(BUNDLE_DIR, "extract_bundle.js")
+        self.namespace = namespace
+        with open(self.bundle_path, "r", encoding="utf-8") as f:
+            source = f.read()
+        self.version = hashlib.sha1(source.encode("utf-8")).hexdigest()[:12]
+        self.source = source.replace("__BUNDLE_VERSION__", self.version)
+        # (session id, window handle) pairs the bundle is registered for
+        self._installed = set()
+        self.stats = {}
+
+    def _target(self, driver):
+        return (driver.session_id, driver.current_window_handle)
+
+    def install(self, driver):
+        """
+        Register the bundle for future documents of this tab and evaluate it in the
+        current one. Returns the number of script bytes sent.
+        """
+        sent = 0
+        target = self._target(driver)
+        if target not in self._installed:
+            driver.execute_cdp_cmd("Page.addScriptToEvaluateOnNewDocument", {"source": self.source})
+            self._installed.add(target)
+            sent += len(self.source)
+        driver.execute_script(self.source)
+        return sent + len(self.source)
+
+    def call(self, driver, function, cfg=None):
+        """Invoke window.<namespace>.<function>(cfg), installing or reinstalling the bundle if needed."""
+        cfg = cfg or {}
+        stats = self.stats.setdefault(function, {"calls": 0, "installs": 0, "reinstalls": 0, "bytesSent": 0,
+                                                 "bytesReceived": 0, "totalMs": 0.0})
+        payload_size = len(_CALL_SCRIPT) + len(json.dumps(cfg)) + len(function) + len(self.namespace)
+        started = time.perf_counter()
+        sent = payload_size
+        if self._target(driver) not in self._installed:
+            # First call on this tab pays for the CDP registration and the bundle itself
+            stats["installs"] += 1
+            sent += self.install(driver)
+
+        # The call script checks the bundle version itself, so presence costs no extra round trip
+        response = driver.execute_script(_CALL_SCRIPT, self.namespace, self.version, function, cfg)
+        if not response or response.get("__missing"):
+            # Navigation race: the document predates registration or was replaced
+            stats["reinstalls"] += 1
+            driver.execute_script(self.source)
+            sent += len(self.source) + payload_size
+            response = driver.execute_script(_CALL_SCRIPT, self.namespace, self.version, function, cfg)
+            if not response or response.get("__missing"):
+                raise RuntimeError(f"Script bundle {self.namespace} is not available in the current document")
+        elapsed_ms = (time.perf_counter() - started) * 1000
+
+        value = response.get("value")
+        received = len(json.dumps(value))
+        stats["calls"] += 1
+        stats["bytesSent"] += sent
+        stats["bytesReceived"] += received
+        stats["totalMs"] += elapsed_ms
+        ipc.metric("script_call", round(elapsed_ms, 2), function=function, bytesSent=sent, bytesReceived=received)
+        return value
+
+    def telemetry(self):
+        """Per-function call counts, payload sizes and latency."""
+        return {
+            function: dict(stats, avgMs=round(stats["totalMs"] / stats["calls"], 2) if stats["calls"] else None,
+                           totalMs=round(stats["totalMs"], 2))
+            for function, stats in self.stats.items()
+        }
@@ -0,0 +1,234 @@
+#!/usr/bin/env python
+"""
+People-search URL builder.
+
+Maps the filters accepted by controller.js sanitizeFilters() onto the search
+page's server-side facet parameters, so LinkedIn does the narrowing instead of
+us scraping and discarding pages of irrelevant results. Facets take numeric
+ids, so company, school, location and industry names are resolved through a
+local JSON lookup table; misses can be resolved once through the site's
+typeahead endpoint and are cached for next time.
+"""
+import json
+import os
+import re
+import tempfile
+import threading
+from urllib.parse import quote
+
+DEFAULT_BASE_URL = "https://www.linkedin.com"
+SEARCH_PATH = "/search/results/people/"
+
+# filter name -> (lookup kind, facet parameter, plain-text fallback parameter)
+FACETS = {
+    "location": ("geo", "geoUrn", None),
+    "currentCompany": ("company", "currentCompany", "company"),
+    "industry": ("industry", "industry", None),
+    "school": ("school", "schoolFilter", "school"),
+}
+
+# connectionDegree accepts the ids used by /api/filters (F, S, O) or plain numbers
+NETWORK_CODES = {"F": "F", "1": "F", "S": "S", "2": "S", "O": "O", "3": "O", "3+": "O"}
+
+# Typeahead entity type per lookup kind
+TYPEAHEAD_TYPES = {"geo": "GEO", "company": "COMPANY", "school": "SCHOOL", "industry": "INDUSTRY"}
+
+# Small built-in seed; everything else is learned into the on-disk table
+SEED_FACETS = {
+    "geo": {
+        "united states": "103644278",
+        "united kingdom": "101165590",
+        "india": "102713980",
+        "germany": "101282230",
+        "canada": "101174742",
+        "france": "105015875",
+    },
+    "company": {
+        "google": "1441",
+        "microsoft": "1035",
+        "amazon": "1586",
+        "apple": "162479",
+    },
+    # Same ids as the /api/filters industry list in server.js
+    "industry": {
+        "information technology": "47",
+        "software development": "4",
+        "financial services": "6",
+        "healthcare": "51",
+        "marketing and advertising": "12",
+    },
+    "school": {},
+}
+
+_ID_RE = re.compile(r"^(?:urn:li:\w+:)?(\d+)$")
+
+# Runs in the page so the request carries the session cookies and CSRF token
+_TYPEAHEAD_SCRIPT = """
+const [keywords, type, done] = arguments;
+const csrf = (document.cookie.match(/JSESSIONID="?([^";]+)/) || [])[1];
+fetch('/voyager/api/typeahead/hitsV2?keywords=' + encodeURIComponent(keywords) +
+      '&origin=OTHER&q=type&type=' + type, {
+    headers: {'csrf-token': csrf, 'accept': 'application/json'}, credentials: 'include'
+}).then(r => r.ok ? r.json() : null).then(done).catch(() => done(null));
+"""
+
+
+def _normalize_name(name):
+    return " ".join(str(name).lower().split())
+
+
+class FacetLookup:
+    """Name -> facet id table persisted as JSON, seeded with SEED_FACETS."""
+
+    def __init__(self, path=None, resolver=None):
+        self.path = path
+        # resolver(kind, name) -> id, or None for a definite miss; raising leaves the name uncached
+        self.resolver = resolver
+        self._lock = threading.Lock()
+        self._table = {kind: dict(values) for kind, values in SEED_FACETS.items()}
+        if path and os.path.exists(path):
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    for kind, values in json.load(f).items():
+                        self._table.setdefault(kind, {}).update(values)
+            except (OSError, ValueError):
+                pass
+
+    def resolve(self, kind, name):
+        """Return the facet id for a name (ids and URNs pass through), or None if unknown."""
+        if not name:
+            return None
+        id_match = _ID_RE.match(str(name).strip())
+        if id_match:
+            return id_match.group(1)
+
+        key = _normalize_name(name)
+        with self._lock:
+            cached = self._table.get(kind, {}).get(key)
+        if cached is not None:
+            # An empty string records a previous miss
+            return cached or None
+        if not self.resolver:
+            return None
+
+        try:
+            resolved = self.resolver(kind, name)
+        except Exception:
+            return None
+        self.remember(kind, name, resolved or "")
+        return resolved or None
+
+    def remember(self, kind, name, facet_id):
+        """
+        Store a resolution (or a miss, as an empty string) and persist the table.
+        Several worker processes can share the file, so entries other processes
+        wrote since it was loaded are merged in first, and every writer uses its own
+        temp file. Failing to persist only loses the cache entry, never the search.
+        """
+        with self._lock:
+            self._table.setdefault(kind, {})[_normalize_name(name)] = str(facet_id)
+            if not self.path:
+                return
+            tmp_path = None
+            try:
+                directory = os.path.dirname(os.path.abspath(self.path))
+                os.makedirs(directory, exist_ok=True)
+                table = {}
+                if os.path.exists(self.path):
+                    try:
+                        with open(self.path, "r", encoding="utf-8") as f:
+                            table = json.load(f)
+                    except ValueError:
+                        table = {}
+                for table_kind, values in self._table.items():
+                    table.setdefault(table_kind, {}).update(values)
+                with tempfile.NamedTemporaryFile("w", encoding="utf-8", dir=directory, prefix=".facet_urns.",
+                                                 suffix=".tmp", delete=False) as f:
+                    tmp_path = f.name
+                    json.dump(table, f, indent=2, sort_keys=True)
+                os.replace(tmp_path, self.path)
+            except OSError:
+                if tmp_path and os.path.exists(tmp_path):
+                    try:
+                        os.remove(tmp_path)
+                    except OSError:
+                        pass
+
+
+def typeahead_resolver(driver):
+    """Return a FacetLookup resolver that queries the typeahead endpoint through the logged-in driver."""
+    def resolve(kind, name):
+        entity_type = TYPEAHEAD_TYPES.get(kind)
+        if not entity_type:
+            return None
+        if not (driver.current_url or "").startswith(("http://", "https://")):
+            raise RuntimeError("Typeahead lookups need a LinkedIn page loaded in the driver")
+        response = driver.execute_async_script(_TYPEAHEAD_SCRIPT, name, entity_type)
+        if response is None:
+            raise RuntimeError(f"Typeahead request failed for {kind} '{name}'")
+        for element in response.get("elements", []):
+            urn = (element.get("targetUrn") or element.get("objectUrn")
+                   or ((element.get("hitInfo") or {}).get("id")) or "")
+            id_match = re.search(r"(\d+)$", str(urn))
+            if id_match:
+                return id_match.group(1)
+        return None
+    return resolve
+
+
+def _list_param(values):
+    """Encode a facet value list the way the search page does: ["a","b"]."""
+    return quote(json.dumps([str(v) for v in values], separators=(",", ":")))
+
+
+def build_search_url(keywords="", filters=None, lookup=None, page=1, base_url=DEFAULT_BASE_URL):
+    """
+    Build a people-search URL for keywords and filters.
+    Returns (url, unapplied) where unapplied lists filters that could not be
+    expressed server-side and still need post-filtering.
+    """
+    filters = filters or {}
+    lookup = lookup or FacetLookup()
+    params = []
+    extra_keywords = []
+    unapplied = []
+
+    for name, (kind, facet_param, text_param) in FACETS.items():
+        values = filters.get(name)
+        if not values:
+            continue
+        # Names can contain commas ("Berlin, Germany"), so only lists are multi-valued
+        if not isinstance(values, (list, tuple)):
+            values = [str(values).strip()]
+        ids = []
+        for value in values:
+            facet_id = lookup.resolve(kind, value)
+            if facet_id:
+                ids.append(facet_id)
+            elif text_param:
+                params.append(f"{text_param}={quote(value)}")
+            else:
+                extra_keywords.append(value)
+        if ids:
+            params.append(f"{facet_param}={_list_param(ids)}")
+
+    degree = filters.get("connectionDegree")
+    if degree:
+        codes = sorted({NETWORK_CODES[d] for d in re.split(r"[,\s]+", str(degree).upper()) if d in NETWORK_CODES})
+        if codes:
+            params.append(f"network={_list_param(codes)}")
+        else:
+            unapplied.append("connectionDegree")
+
+    # The people search page has no experience facet
+    if filters.get("yearsOfExperience"):
+        unapplied.append("yearsOfExperience")
+
+    all_keywords = " ".join(k for k in [keywords] + extra_keywords if k)
+    if all_keywords:
+        params.insert(0, f"keywords={quote(all_keywords)}")
+    if params:
+        params.append("origin=FACETED_SEARCH")
+    if page and page > 1:
+        params.append(f"page={int(page)}")
+    return base_url.rstrip("/") + SEARCH_PATH + "?" + "&".join(params), unapplied
@@ -0,0 +1,292 @@
+#!/usr/bin/env python
+"""
+Archive of raw page sources for debugging broken selectors.
+
+Every captured ``driver.page_source`` is compressed (zstd when the
+``zstandard`` package is installed, gzip otherwise) and stored once per
+content hash under ``blobs/``, so re-captures of an identical page cost only
+an index row. ``snapshots.db`` indexes captures by URL, page kind and time.
+Compression and disk writes happen on a background thread; the scraping
+thread only reads the page source and enqueues it. Once the archive grows
+past ``max_bytes`` the oldest snapshots are dropped.
+
+Archived pages can be listed, loaded and exported as plain HTML fixtures:
+
+    python snapshot_archive.py <archiveDir> list [url]
+    python snapshot_archive.py <archiveDir> export <snapshotId> <file.html>
+"""
+import gzip
+import hashlib
+import json
+import logging
+import os
+import queue
+import sqlite3
+import sys
+import threading
+import time
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+import worker_logging
+
+logger = logging.getLogger(worker_logging.LOGGER_NAME)
+
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+
+CODEC_EXTENSIONS = {"zstd": ".html.zst", "gzip": ".html.gz"}
+
+
+def _compress(data, codec):
+    if codec == "zstd":
+        return zstandard.ZstdCompressor(level=10).compress(data)
+    return gzip.compress(data, compresslevel=6)
+
+
+def _decompress(data, codec):
+    if codec == "zstd":
+        if zstandard is None:
+            raise RuntimeError("Snapshot is zstd-compressed but the zstandard package is not installed")
+        return zstandard.ZstdDecompressor().decompress(data)
+    return gzip.decompress(data)
+
+
+class SnapshotArchive:
+    """Content-addressed, size-bounded store of page sources with a background writer."""
+
+    def __init__(self, archive_dir, max_bytes=DEFAULT_MAX_BYTES, queue_size=32):
+        self.archive_dir = archive_dir
+        self.blob_dir = os.path.join(archive_dir, "blobs")
+        os.makedirs(self.blob_dir, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.codec = "zstd" if zstandard is not None else "gzip"
+        self.dropped = 0
+        self.failed = 0
+        self.written = 0
+        self.deduplicated = 0
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(os.path.join(archive_dir, "snapshots.db"), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS blobs (
+                hash TEXT PRIMARY KEY,
+                codec TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                stored_size INTEGER NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS snapshots (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                url TEXT NOT NULL,
+                kind TEXT NOT NULL,
+                taken_at REAL NOT NULL,
+                hash TEXT NOT NULL,
+                meta TEXT
+            );
+            CREATE INDEX IF NOT EXISTS snapshots_url ON snapshots (url, taken_at);
+            CREATE INDEX IF NOT EXISTS snapshots_taken_at ON snapshots (taken_at);
+        """)
+        self._conn.commit()
+
+        # Bounded so a slow disk never holds more than a few pages in memory
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._writer = threading.Thread(target=self._write_loop, name="snapshot-writer", daemon=True)
+        self._writer.start()
+
+    def capture(self, driver, kind, url=None, **meta):
+        """
+        Queue the driver's current page for archiving. Reading page_source is the
+        only work done on the calling thread; if the writer is backed up the
+        snapshot is dropped rather than blocking the scrape.
+        """
+        try:
+            html = driver.page_source
+            url = url or driver.current_url
+        except Exception:
+            return False
+        try:
+            self._queue.put_nowait((url, kind, time.time(), html, meta))
+            return True
+        except queue.Full:
+            self.dropped += 1
+            return False
+
+    def _write_loop(self):
+        while True:
+            item = self._queue.get()
+            try:
+                if item is None:
+                    return
+                self._store(*item)
+            except Exception as e:
+                self.failed += 1
+                # A %-template, so repeats from a failing disk are throttled by the worker's RepeatFilter
+                logger.warning("Snapshot archive write failed: %s", e)
+            finally:
+                self._queue.task_done()
+
+    def _blob_path(self, digest, codec):
+        return os.path.join(self.blob_dir, digest[:2], digest + CODEC_EXTENSIONS[codec])
+
+    def _store(self, url, kind, taken_at, html, meta):
+        data = html.encode("utf-8")
+        digest = hashlib.sha256(data).hexdigest()
+        with self._lock:
+            known = self._conn.execute("SELECT 1 FROM blobs WHERE hash = ?", (digest,)).fetchone()
+        if known:
+            self.deduplicated += 1
+        else:
+            compressed = _compress(data, self.codec)
+            path = self._blob_path(digest, self.codec)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = path + ".tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(compressed)
+            os.replace(tmp_path, path)
+            with self._lock:
+                self._conn.execute(
+                    "INSERT OR IGNORE INTO blobs (hash, codec, size, stored_size) VALUES (?, ?, ?, ?)",
+                    (digest, self.codec, len(data), len(compressed))
+                )
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO snapshots (url, kind, taken_at, hash, meta) VALUES (?, ?, ?, ?, ?)",
+                (url, kind, taken_at, digest, json.dumps(meta) if meta else None)
+            )
+            self._conn.commit()
+        self.written += 1
+        if not known:
+            self._enforce_retention()
+
+    def _enforce_retention(self):
+        """Drop the oldest snapshots, and blobs no snapshot references, until under max_bytes."""
+        if not self.max_bytes:
+            return
+        with self._lock:
+            total = self._conn.execute("SELECT COALESCE(SUM(stored_size), 0) FROM blobs").fetchone()[0]
+            if total <= self.max_bytes:
+                return
+            oldest = self._conn.execute("SELECT id FROM snapshots ORDER BY taken_at, id").fetchall()
+            for (snapshot_id,) in oldest:
+                if total <= self.max_bytes:
+                    break
+                digest = self._conn.execute("SELECT hash FROM snapshots WHERE id = ?", (snapshot_id,)).fetchone()[0]
+                self._conn.execute("DELETE FROM snapshots WHERE id = ?", (snapshot_id,))
+                if self._conn.execute("SELECT 1 FROM snapshots WHERE hash = ? LIMIT 1", (digest,)).fetchone():
+                    continue
+                codec, stored_size = self._conn.execute(
+                    "SELECT codec, stored_size FROM blobs WHERE hash = ?", (digest,)
+                ).fetchone()
+                self._conn.execute("DELETE FROM blobs WHERE hash = ?", (digest,))
+                try:
+                    os.remove(self._blob_path(digest, codec))
+                except OSError:
+                    pass
+                total -= stored_size
+            self._conn.commit()
+
+    def flush(self):
+        """Block until every queued snapshot has been written."""
+        self._queue.join()
+
+    def close(self):
+        """Write out pending snapshots and stop the writer."""
+        self._queue.put(None)
+        self._writer.join()
+        with self._lock:
+            self._conn.close()
+
+    def list(self, url=None, kind=None, since=None, limit=100):
+        """Snapshot records, newest first, optionally filtered by URL, kind and capture time."""
+        sql = ("SELECT s.id, s.url, s.kind, s.taken_at, s.hash, s.meta, b.size, b.stored_size "
+               "FROM snapshots s JOIN blobs b ON b.hash = s.hash")
+        clauses, params = [], []
+        if url:
+            clauses.append("s.url = ?")
+            params.append(url)
+        if kind:
+            clauses.append("s.kind = ?")
+            params.append(kind)
+        if since:
+            clauses.append("s.taken_at >= ?")
+            params.append(since)
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += " ORDER BY s.taken_at DESC, s.id DESC LIMIT ?"
+        params.append(int(limit))
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        return [{
+            "id": row[0],
+            "url": row[1],
+            "kind": row[2],
+            "takenAt": row[3],
+            "hash": row[4],
+            "meta": json.loads(row[5]) if row[5] else {},
+            "size": row[6],
+            "storedSize": row[7],
+        } for row in rows]
+
+    def load(self, snapshot_id):
+        """Return the decompressed HTML of a snapshot."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT b.hash, b.codec FROM snapshots s JOIN blobs b ON b.hash = s.hash WHERE s.id = ?",
+                (snapshot_id,)
+            ).fetchone()
+        if not row:
+            raise KeyError(f"No snapshot with id {snapshot_id}")
+        digest, codec = row
+        with open(self._blob_path(digest, codec), "rb") as f:
+            return _decompress(f.read(), codec).decode("utf-8")
+
+    def iter_pages(self, url=None, kind=None, since=None, limit=100):
+        """Yield (record, html) pairs for offline re-parsing."""
+        for record in self.list(url, kind, since, limit):
+            yield record, self.load(record["id"])
+
+    def export_fixture(self, snapshot_id, path):
+        """Write a snapshot as a plain HTML file, e.g. for a regression fixture."""
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(self.load(snapshot_id))
+        return path
+
+    def stats(self):
+        """Counters for the JSON result."""
+        with self._lock:
+            snapshots, blobs, size, stored_size = self._conn.execute(
+                "SELECT (SELECT COUNT(*) FROM snapshots), COUNT(*), COALESCE(SUM(size), 0), "
+                "COALESCE(SUM(stored_size), 0) FROM blobs"
+            ).fetchone()
+        return {
+            "codec": self.codec,
+            "snapshots": snapshots,
+            "blobs": blobs,
+            "bytes": size,
+            "storedBytes": stored_size,
+            "written": self.written,
+            "deduplicated": self.deduplicated,
+            "dropped": self.dropped,
+            "failed": self.failed,
+        }
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 3:
+        print(__doc__)
+        sys.exit(1)
+    archive = SnapshotArchive(sys.argv[1])
+    command = sys.argv[2]
+    if command == "list":
+        for record in archive.list(url=sys.argv[3] if len(sys.argv) > 3 else None):
+            taken_at = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(record["takenAt"]))
+            print(f"{record['id']}\t{taken_at}\t{record['kind']}\t{record['storedSize']}\t{record['url']}")
+    elif command == "export":
+        print(archive.export_fixture(int(sys.argv[3]), sys.argv[4]))
+    else:
+        print(__doc__)
+    archive.close()
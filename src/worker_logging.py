@@ -0,0 +1,137 @@
+#!/usr/bin/env python
+"""
+Queue based logging for the Python worker.
+
+Callers only build a LogRecord and put it on an in-memory queue; formatting,
+deduplication and writing the log frame (see ipc.py) happen on a background
+QueueListener thread. Records below the configured level are rejected by the
+logger before a record is even created.
+"""
+import atexit
+import logging
+import logging.handlers
+import queue
+import sys
+import time
+
+import ipc
+
+LOGGER_NAME = "linkedin_scraper"
+
+_LEVEL_NAMES = {
+    logging.DEBUG: "debug",
+    logging.INFO: "info",
+    logging.WARNING: "warning",
+    logging.ERROR: "error",
+    logging.CRITICAL: "error",
+}
+
+
+class DeferredQueueHandler(logging.handlers.QueueHandler):
+    """
+    QueueHandler that leaves formatting to the listener thread.
+    The stock prepare() formats the message in the calling thread and drops
+    the template, which is what RepeatFilter groups on.
+    """
+
+    def prepare(self, record):
+        return record
+
+
+class RepeatFilter(logging.Filter):
+    """
+    Let the first `burst` records of a message template through per `window`
+    seconds and count the rest. The count is attached to the next record of
+    that template that gets through.
+    """
+
+    def __init__(self, burst=3, window=60.0):
+        super().__init__()
+        self.burst = burst
+        self.window = window
+        self._seen = {}
+
+    def filter(self, record):
+        key = (record.levelno, record.msg if isinstance(record.msg, str) else repr(record.msg))
+        now = time.monotonic()
+        window_start, count, suppressed = self._seen.get(key, (now, 0, 0))
+        if now - window_start > self.window:
+            window_start, count = now, 0
+        if count >= self.burst:
+            self._seen[key] = (window_start, count, suppressed + 1)
+            return False
+        self._seen[key] = (window_start, count + 1, 0)
+        if suppressed:
+            record.suppressed = suppressed
+        return True
+
+    def pending(self):
+        """Return (template, suppressed count) for templates with unreported repeats."""
+        return [(key[1], state[2]) for key, state in self._seen.items() if state[2]]
+
+
+class ChannelHandler(logging.Handler):
+    """Writes records as IPC log frames, or to stderr if no channel is open."""
+
+    def emit(self, record):
+        try:
+            data = {
+                "level": _LEVEL_NAMES.get(record.levelno, "info"),
+                "message": record.getMessage(),
+                "time": record.created,
+            }
+            if getattr(record, "fields", None):
+                data["fields"] = record.fields
+            if getattr(record, "suppressed", 0):
+                data["suppressed"] = record.suppressed
+            if record.exc_info:
+                data["traceback"] = logging.Formatter().formatException(record.exc_info)
+
+            if ipc.channel is not None:
+                ipc.channel.send("log", data)
+            else:
+                print(f"[{data['level']}] {data['message']}", file=sys.stderr)
+        except Exception:
+            self.handleError(record)
+
+
+_listener = None
+_repeat_filter = None
+
+
+def setup_logging(level="info", burst=3, window=60.0):
+    """Attach the queue handler to the worker logger and start the writer thread."""
+    global _listener, _repeat_filter
+    logger = logging.getLogger(LOGGER_NAME)
+    logger.setLevel(getattr(logging, str(level).upper(), logging.INFO))
+    logger.propagate = False
+    if _listener is not None:
+        return logger
+
+    log_queue = queue.SimpleQueue()
+    logger.addHandler(DeferredQueueHandler(log_queue))
+
+    handler = ChannelHandler()
+    _repeat_filter = RepeatFilter(burst=burst, window=window)
+    handler.addFilter(_repeat_filter)
+
+    _listener = logging.handlers.QueueListener(log_queue, handler)
+    _listener.start()
+    atexit.register(shutdown_logging)
+    return logger
+
+
+def shutdown_logging():
+    """Drain the queue, report suppressed repeats and stop the writer thread."""
+    global _listener
+    if _listener is None:
+        return
+    _listener.stop()
+    _listener = None
+    if _repeat_filter is not None:
+        handler = ChannelHandler()
+        for template, count in _repeat_filter.pending():
+            handler.handle(logging.LogRecord(
+                LOGGER_NAME, logging.INFO, __file__, 0,
+                "Suppressed %d repeats of: %s", (count, template), None
+            ))
@@ -0,0 +1,133 @@
+#!/usr/bin/env python
+"""
+Browserless worker for the coordinator tests.
+
+Speaks the same stdin/NDJSON protocol as linkedin_scraper_script.py for the
+login, search and enrich actions, but fetches the stand-in server's pages with
+urllib instead of Chrome. Results have the same shape as the real worker's,
+including the circuit breaker's behaviour when the session is lost mid-batch.
+The session cookie is kept in the shard's userDataDir like Chrome's profile.
+"""
+import json
+import os
+import re
+import sys
+import types
+import urllib.parse
+import urllib.request
+from http.cookiejar import CookieJar
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+import ipc  # noqa: E402
+import scrape_errors  # noqa: E402
+from profile_index import canonical_profile_url, site_profile_url  # noqa: E402
+from scrape_errors import CircuitBreaker, CircuitOpenError, ScrapeError  # noqa: E402
+
+CARD_RE = re.compile(
+    r'data-chameleon-result-urn="([^"]+)".*?href="([^"]+)"><span>([^<]*)</span>.*?'
+    r'tvZyUTymqQUmWAonPMfdpcDvzAIYFHuWLfBUE">([^<]*)<.*?HhmzfnhfsJBnlckYHmnKptNFyvpjjiSpBs">([^<]*)<',
+    re.DOTALL,
+)
+
+
+class Session:
+    """urllib opener whose li_at cookie is persisted in the user data directory."""
+
+    def __init__(self, base_url, user_data_dir):
+        self.base_url = base_url.rstrip("/")
+        os.makedirs(user_data_dir, exist_ok=True)
+        self.cookie_path = os.path.join(user_data_dir, "li_at")
+        self.jar = CookieJar()
+        self.opener = urllib.request.build_opener(urllib.request.HTTPCookieProcessor(self.jar))
+
+    def _headers(self):
+        if os.path.exists(self.cookie_path):
+            with open(self.cookie_path, "r", encoding="utf-8") as f:
+                return {"Cookie": f"li_at={f.read().strip()}"}
+        return {}
+
+    def get(self, url):
+        """Fetch a page; returns a driver-like page (current_url, title, page_source)."""
+        request = urllib.request.Request(url, headers=self._headers())
+        with self.opener.open(request, timeout=10) as response:
+            body = response.read().decode("utf-8")
+            final_url = response.geturl()
+        title = re.search(r"<title>([^<]*)</title>", body)
+        return types.SimpleNamespace(current_url=final_url, title=title.group(1) if title else "", page_source=body)
+
+    def login(self, email, password):
+        data = urllib.parse.urlencode({"session_key": email, "session_password": password}).encode("utf-8")
+        with self.opener.open(urllib.request.Request(f"{self.base_url}/login", data=data), timeout=10) as response:
+            response.read()
+        for cookie in self.jar:
+            if cookie.name == "li_at":
+                with open(self.cookie_path, "w", encoding="utf-8") as f:
+                    f.write(cookie.value)
+                return True
+        return False
+
+
+def search(session, keywords, max_results):
+    page = session.get(f"{session.base_url}/search/results/people/?keywords={urllib.parse.quote(keywords)}")
+    page_class = scrape_errors.inspect_page(page)
+    if page_class:
+        raise ScrapeError(f"Search page unavailable ({page_class}): {page.current_url}", page_class)
+    profiles = []
+    for urn, href, name, title, location in CARD_RE.findall(page.page_source)[:max_results]:
+        profiles.append({"name": name, "profileUrl": canonical_profile_url(href), "title": title,
+                         "location": location, "memberUrn": urn})
+    return profiles
+
+
+def enrich(session, profiles, breaker, emit):
+    """Mirror of enrich_profiles(): the breaker stops the batch once the session is gone."""
+    for profile in profiles:
+        breaker.before_call()
+        page = session.get(site_profile_url(profile["profileUrl"], session.base_url))
+        error_class = scrape_errors.inspect_page(page)
+        if error_class:
+            profile["detailsError"] = breaker.record_failure(error_class)
+        else:
+            breaker.record_success()
+            name = re.search(r"<h1[^>]*>([^<]*)</h1>", page.page_source).group(1)
+            profile["name"] = name
+            profile["details"] = {"name": name, "experience": [], "education": []}
+        emit(profile)
+    return profiles
+
+
+if __name__ == "__main__":
+    args = json.loads(sys.stdin.read())
+    channel = ipc.open_channel(args.get("logLevel", "info"))
+    session = Session(args.get("baseUrl", ""), args["userDataDir"])
+    breaker = CircuitBreaker(args.get("breakerThresholds"), args.get("breakerPauses"))
+    result = {"success": False}
+    try:
+        action = args.get("action")
+        if action == "login":
+            result["success"] = session.login(args.get("email"), args.get("password"))
+            if not result["success"]:
+                result["errorClass"] = scrape_errors.AUTH_LOST
+        elif action == "search":
+            result["profiles"] = search(session, args.get("keywords", ""), args.get("maxResults", 10))
+            result["success"] = True
+        elif action == "enrich":
+            profiles = [{"name": "Unknown", "profileUrl": canonical_profile_url(url), "title": "", "location": ""}
+                        for url in args.get("profileUrls", [])]
+            try:
+                enrich(session, profiles, breaker, lambda profile: channel.item("profiles", profile))
+            except CircuitOpenError as e:
+                result["error"] = str(e)
+                result["errorClass"] = e.error_class
+            for profile in profiles[channel.streamed.get("profiles", 0):]:
+                channel.item("profiles", profile)
+            result["success"] = True
+        else:
+            result["error"] = f"Unknown action: {action}"
+    except Exception as e:
+        result["error"] = str(e)
+        result["errorClass"] = scrape_errors.classify(e)
+    finally:
+        result["errorCounts"] = breaker.snapshot()
+        channel.result(result, stream_key="profiles")
@@ -0,0 +1,227 @@
+#!/usr/bin/env python
+"""
+Minimal stand-in for the LinkedIn pages the worker visits.
+
+Serves a login form, the feed, people search results and profile pages with
+the same markers the scraper looks for (form ids, result card/link/title/
+location selectors, /login redirects when the session is gone), so
+crawl_coordinator.py can be run locally with ``workerArgs.baseUrl`` pointing
+here. Sessions are a ``li_at`` cookie holding the account email; an account
+can be revoked, optionally after a number of profile views, to simulate a
+lost session. Every request is recorded as (account, path) for assertions.
+
+    python tests/stand_in_server.py [port]
+"""
+import hashlib
+import html
+import re
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+CARD_TEMPLATE = (
+    '<li class="reusable-search__result-container">'
+    '<div data-chameleon-result-urn="urn:li:member:{member_id}">'
+    '<a class="eBOSiHffioaRqrowDPILgMQbHBQe" href="{base}/in/{slug}/?miniProfileUrn=x"><span>{name}</span></a>'
+    '<div class="tvZyUTymqQUmWAonPMfdpcDvzAIYFHuWLfBUE">{title}</div>'
+    '<div class="HhmzfnhfsJBnlckYHmnKptNFyvpjjiSpBs">{location}</div>'
+    '</div></li>'
+)
+
+PROFILE_TEMPLATE = """<html><head><title>{name} | LinkedIn</title></head><body>
+<main><section>
+<h1 class="text-heading-xlarge">{name}</h1>
+<div class="text-body-medium">{title}</div>
+<span class="text-body-small">{location}</span>
+<section id="about"><p>{name} works on {keywords}.</p></section>
+<section id="experience"><ul>
+<li class="experience"><span class="position">{title}</span><span class="company">Acme</span><span class="dates">Jan 2019 - Present</span></li>
+</ul></section>
+</section></main></body></html>"""
+
+LOGIN_PAGE = """<html><head><title>LinkedIn Login</title></head><body>
+<form method="post" action="/login">
+<input id="username" name="session_key"><input id="password" name="session_password" type="password">
+<button type="submit">Sign in</button>
+</form></body></html>"""
+
+FEED_PAGE = """<html><head><title>Feed | LinkedIn</title></head><body>
+<nav><button class="global-nav__me">Me</button></nav><main class="scaffold-layout__main">Feed</main>
+</body></html>"""
+
+
+def person(slug):
+    """Deterministic fake person for a profile slug."""
+    digest = int(hashlib.md5(slug.encode("utf-8")).hexdigest()[:8], 16)
+    titles = ["VP Sales", "Head of Marketing", "Account Executive", "Software Engineer"]
+    locations = ["Berlin, Germany", "London, United Kingdom", "Paris, France"]
+    return {
+        "slug": slug,
+        "memberId": digest % 10_000_000,
+        "name": slug.replace("-", " ").title(),
+        "title": titles[digest % len(titles)],
+        "location": locations[digest % len(locations)],
+    }
+
+
+def people_for(keywords, count):
+    """The search results for keywords: count people whose slugs derive from the keywords."""
+    words = re.findall(r"\w+", keywords.lower()) or ["someone"]
+    return [person(f"{words[i % len(words)]}-person-{i}") for i in range(count)]
+
+
+class StandInServer:
+    """Threaded HTTP server with per-account session state."""
+
+    def __init__(self, accounts, port=0, results_per_search=10):
+        # email -> password
+        self.accounts = dict(accounts)
+        self.results_per_search = results_per_search
+        self.revoked = set()
+        # email -> remaining profile views before the session is revoked
+        self.revoke_after = {}
+        self.requests = []
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", port), self._handler())
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def revoke(self, email, after_profile_views=0):
+        """Invalidate an account's session now, or after a number of profile page views."""
+        with self._lock:
+            if after_profile_views:
+                self.revoke_after[email] = after_profile_views
+            else:
+                self.revoked.add(email)
+
+    def profile_views(self, email=None):
+        """Profile paths requested with a valid session, optionally for one account."""
+        with self._lock:
+            return [path for account, path, served in self.requests
+                    if served and path.startswith("/in/") and (email is None or account == email)]
+
+    def _session(self, handler):
+        """Return the logged-in account of a request, or None."""
+        cookies = handler.headers.get("Cookie") or ""
+        match = re.search(r"li_at=([^;]+)", cookies)
+        email = match.group(1) if match else None
+        with self._lock:
+            if email not in self.accounts or email in self.revoked:
+                return None
+        return email
+
+    def _count_profile_view(self, email):
+        with self._lock:
+            if email in self.revoke_after:
+                self.revoke_after[email] -= 1
+                if self.revoke_after[email] <= 0:
+                    del self.revoke_after[email]
+                    self.revoked.add(email)
+
+    def _record(self, email, path, served):
+        with self._lock:
+            self.requests.append((email, path, served))
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def _send(self, status, body="", headers=None):
+                data = body.encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "text/html; charset=utf-8")
+                self.send_header("Content-Length", str(len(data)))
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(data)
+
+            def _redirect(self, location, headers=None):
+                self._send(302, "", dict(headers or {}, Location=location))
+
+            def do_GET(self):
+                url = urlparse(self.path)
+                email = server._session(self)
+                if url.path in ("/login", "/uas/login"):
+                    server._record(email, url.path, True)
+                    return self._send(200, LOGIN_PAGE)
+                if email is None:
+                    server._record(email, url.path, False)
+                    return self._redirect("/login")
+
+                if url.path.startswith("/in/"):
+                    # The view that triggers a scheduled revocation is the first one refused
+                    server._count_profile_view(email)
+                    if server._session(self) is None:
+                        server._record(email, url.path, False)
+                        return self._redirect("/login")
+                server._record(email, url.path, True)
+
+                if url.path in ("/", "/feed", "/feed/"):
+                    return self._send(200, FEED_PAGE)
+                if url.path.startswith("/search/results/people"):
+                    keywords = parse_qs(url.query).get("keywords", [""])[0]
+                    cards = "".join(CARD_TEMPLATE.format(
+                        base=server.base_url,
+                        member_id=p["memberId"],
+                        slug=p["slug"],
+                        name=html.escape(p["name"]),
+                        title=html.escape(p["title"]),
+                        location=html.escape(p["location"]),
+                    ) for p in people_for(keywords, server.results_per_search))
+                    return self._send(200, '<html><head><title>Search | LinkedIn</title></head><body>'
+                                           '<div class="search-results-container"><ul>' + cards + '</ul></div>'
+                                           '</body></html>')
+                profile_match = re.match(r"^/in/([^/]+)/?", url.path)
+                if profile_match:
+                    p = person(profile_match.group(1))
+                    return self._send(200, PROFILE_TEMPLATE.format(
+                        name=html.escape(p["name"]), title=html.escape(p["title"]),
+                        location=html.escape(p["location"]), keywords=html.escape(p["slug"])))
+                return self._send(404, "<html><body>Not found</body></html>")
+
+            def do_POST(self):
+                url = urlparse(self.path)
+                length = int(self.headers.get("Content-Length") or 0)
+                form = parse_qs(self.rfile.read(length).decode("utf-8"))
+                if url.path != "/login":
+                    return self._send(404, "")
+                email = form.get("session_key", [""])[0]
+                password = form.get("session_password", [""])[0]
+                server._record(email, url.path, True)
+                with server._lock:
+                    valid = server.accounts.get(email) == password
+                    if valid:
+                        server.revoked.discard(email)
+                if not valid:
+                    return self._send(200, LOGIN_PAGE)
+                return self._redirect("/feed/", {"Set-Cookie": f"li_at={email}; Path=/"})
+
+        return Handler
+
+
+if __name__ == "__main__":
+    port = int(sys.argv[1]) if len(sys.argv) > 1 else 8080
+    server = StandInServer({"a@example.com": "secret", "b@example.com": "secret"}, port=port).start()
+    print(f"Stand-in server on {server.base_url} (accounts a@example.com, b@example.com / secret)")
+    try:
+        server._thread.join()
+    except KeyboardInterrupt:
+        server.stop()
@@ -0,0 +1,101 @@
+"""
+Routing and rerouting tests for crawl_coordinator.py against the stand-in server.
+
+Run with ``python -m unittest discover tests`` (or pytest) from the repo root.
+"""
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(TESTS_DIR, "..", "src"))
+sys.path.insert(0, TESTS_DIR)
+
+from crawl_coordinator import CrawlCoordinator  # noqa: E402
+from profile_index import profile_key  # noqa: E402
+from stand_in_server import StandInServer, people_for  # noqa: E402
+
+WORKER = [sys.executable, "-u", os.path.join(TESTS_DIR, "http_worker.py")]
+ACCOUNTS = {"a@example.com": "secret", "b@example.com": "secret", "c@example.com": "secret"}
+
+
+class CrawlCoordinatorTest(unittest.TestCase):
+
+    def setUp(self):
+        self.server = StandInServer(ACCOUNTS, results_per_search=8).start()
+        self.data_dir = tempfile.mkdtemp(prefix="crawl_test_")
+
+    def tearDown(self):
+        self.server.stop()
+        shutil.rmtree(self.data_dir, ignore_errors=True)
+
+    def coordinator(self, batch_size=3):
+        accounts = [{"id": email.split("@")[0], "email": email, "password": password, "command": WORKER}
+                    for email, password in ACCOUNTS.items()]
+        coordinator = CrawlCoordinator(accounts, self.data_dir, worker_args={"baseUrl": self.server.base_url},
+                                       batch_size=batch_size)
+        coordinator.login_all()
+        return coordinator
+
+    def test_profiles_are_enriched_on_their_owning_shard(self):
+        coordinator = self.coordinator()
+        profiles = list(coordinator.crawl([{"keywords": "sales"}, {"keywords": "marketing"}]))
+
+        expected = {profile_key(f"https://www.linkedin.com/in/{p['slug']}/")
+                    for keywords in ("sales", "marketing") for p in people_for(keywords, 8)}
+        self.assertEqual({profile_key(p["profileUrl"]) for p in profiles}, expected)
+        for profile in profiles:
+            self.assertTrue(profile.get("details"), profile)
+            owner = coordinator.ring.node_for(profile_key(profile["profileUrl"]))
+            self.assertEqual(profile["shard"], owner)
+            # Navigation followed baseUrl, while identity stayed on the canonical URL
+            self.assertTrue(profile["profileUrl"].startswith("https://www.linkedin.com/in/"))
+            slug_path = "/in/" + profile["profileUrl"].rstrip("/").rsplit("/", 1)[1] + "/"
+            self.assertIn(slug_path, self.server.profile_views(f"{owner}@example.com"))
+        self.assertEqual(coordinator.stats["rerouted"], 0)
+        self.assertTrue(all(not shard["down"] for shard in coordinator.shard_report().values()))
+
+    def test_duplicates_across_queries_are_emitted_once(self):
+        coordinator = self.coordinator()
+        profiles = list(coordinator.crawl([{"keywords": "sales"}, {"keywords": "sales", "location": "Berlin"}],
+                                          enrich=False))
+        self.assertEqual(len(profiles), 8)
+        self.assertEqual(coordinator.stats["duplicates"], 8)
+
+    def test_shard_losing_its_session_mid_batch_is_rerouted(self):
+        coordinator = self.coordinator()
+        urls = [f"https://www.linkedin.com/in/{p['slug']}/" for p in people_for("engineer", 24)]
+        owned_by_a = [url for url in urls if coordinator.ring.node_for(profile_key(url)) == "a"]
+        self.assertGreater(len(owned_by_a), 1)
+        # a serves one profile page, then its session is gone
+        self.server.revoke("a@example.com", after_profile_views=2)
+
+        profiles = list(coordinator.crawl(profiles=urls))
+
+        self.assertEqual(len(profiles), len(urls))
+        for profile in profiles:
+            self.assertTrue(profile.get("details"), profile)
+        report = coordinator.shard_report()
+        self.assertEqual(report["a"]["down"], "auth_lost")
+        self.assertGreater(coordinator.stats["rerouted"], 0)
+        served_by_a = [p for p in profiles if p["shard"] == "a"]
+        self.assertEqual(len(served_by_a), 1)
+        self.assertEqual(len(self.server.profile_views("a@example.com")), 1)
+
+    def test_no_healthy_shard_left_still_emits_search_fields(self):
+        coordinator = self.coordinator()
+        urls = [f"https://www.linkedin.com/in/{p['slug']}/" for p in people_for("founder", 6)]
+        for email in ACCOUNTS:
+            self.server.revoke(email)
+
+        profiles = list(coordinator.crawl(profiles=urls))
+
+        self.assertEqual(len(profiles), len(urls))
+        self.assertTrue(all(not p.get("details") for p in profiles))
+        self.assertTrue(all(shard["down"] for shard in coordinator.shard_report().values()))
+
+
+if __name__ == "__main__":
+    unittest.main()
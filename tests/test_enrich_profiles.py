@@ -0,0 +1,93 @@
+"""
+Tests for the real worker's enrich_profiles() (the enrich action used by the
+coordinator), with get_profile_details() replaced so no browser is needed.
+Skipped when selenium or linkedin_scraper is not installed.
+
+Run with ``python -m unittest discover tests`` (or pytest) from the repo root.
+"""
+import importlib.util
+import os
+import shutil
+import sys
+import tempfile
+import types
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+import scrape_errors  # noqa: E402
+from profile_index import ProfileIndex  # noqa: E402
+from scrape_errors import CircuitBreaker, CircuitOpenError, ScrapeError  # noqa: E402
+
+HAS_WORKER_DEPS = all(importlib.util.find_spec(name) for name in ("selenium", "linkedin_scraper"))
+if HAS_WORKER_DEPS:
+    import linkedin_scraper_script as worker
+
+
+def bare(slug):
+    """A profile as the enrich action builds it from a bare URL."""
+    return {"name": "Unknown", "profileUrl": f"https://www.linkedin.com/in/{slug}/", "title": "", "location": ""}
+
+
+def details(slug):
+    return {"name": slug.title(), "headline": f"Head of {slug}", "location": "Berlin, Germany",
+            "experience": [], "education": []}
+
+
+@unittest.skipUnless(HAS_WORKER_DEPS, "selenium and linkedin_scraper are required to import the worker")
+class EnrichProfilesTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp(prefix="enrich_test_")
+        self.index = ProfileIndex(os.path.join(self.tmp, "profile_index.db"))
+        self.driver = types.SimpleNamespace(current_url="https://www.linkedin.com/feed/")
+        self.emitted = []
+        self.fetched = []
+
+    def tearDown(self):
+        self.index.close()
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def fake_details(self, failures=()):
+        def get_profile_details(driver, profile_url, archive=None):
+            slug = profile_url.rstrip("/").rsplit("/", 1)[1]
+            self.fetched.append(slug)
+            if slug in failures:
+                raise ScrapeError("Redirected to login", scrape_errors.AUTH_LOST, profile_url)
+            driver.current_url = profile_url
+            return details(slug)
+        return mock.patch.object(worker, "get_profile_details", get_profile_details)
+
+    def enrich(self, profiles, breaker=None):
+        return worker.enrich_profiles(self.driver, profiles, len(profiles), self.index, None, None, breaker,
+                                      None, lambda profile: self.emitted.append(dict(profile)))
+
+    def test_index_hits_fill_card_fields_and_are_emitted_in_order(self):
+        with self.fake_details():
+            self.enrich([bare("alpha")])
+        self.emitted.clear()
+
+        with self.fake_details():
+            profiles = self.enrich([bare("alpha"), bare("beta")])
+
+        self.assertEqual(self.fetched, ["alpha", "beta"])
+        self.assertEqual([p["name"] for p in self.emitted], ["Alpha", "Beta"])
+        cached = profiles[0]
+        self.assertEqual((cached["name"], cached["title"], cached["location"]),
+                         ("Alpha", "Head of alpha", "Berlin, Germany"))
+        self.assertEqual(cached["details"]["headline"], "Head of alpha")
+
+    def test_lost_session_stops_the_batch_after_emitting_the_failed_profile(self):
+        breaker = CircuitBreaker()
+        with self.fake_details(failures={"beta"}), self.assertRaises(CircuitOpenError) as caught:
+            self.enrich([bare("alpha"), bare("beta"), bare("gamma")], breaker)
+
+        self.assertEqual(caught.exception.error_class, scrape_errors.AUTH_LOST)
+        self.assertEqual(self.fetched, ["alpha", "beta"])
+        self.assertEqual([p["profileUrl"].rstrip("/").rsplit("/", 1)[1] for p in self.emitted], ["alpha", "beta"])
+        self.assertEqual(self.emitted[1]["detailsError"], scrape_errors.AUTH_LOST)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,75 @@
+"""
+Date parsing and normalisation tests for post_processing.py.
+
+Run with ``python -m unittest discover tests`` (or pytest) from the repo root.
+"""
+import os
+import sys
+import unittest
+from datetime import date
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from post_processing import normalize_profile, parse_date, parse_date_range  # noqa: E402
+
+TODAY = date(2026, 6, 15)
+
+
+class ParseDateRangeTest(unittest.TestCase):
+
+    def test_parse_date(self):
+        self.assertEqual(parse_date("Jan 2020"), (2020, 1))
+        self.assertEqual(parse_date("September 2018"), (2018, 9))
+        self.assertEqual(parse_date("2014"), (2014, None))
+        self.assertIsNone(parse_date("Present"))
+        self.assertIsNone(parse_date(None))
+
+    def test_ranges(self):
+        cases = [
+            ("Jan 2020 - Present", {"start": "2020-01", "end": None, "current": True, "months": 78}),
+            ("Mar 2018 - Jun 2021 · 3 yrs 4 mos", {"start": "2018-03", "end": "2021-06", "current": False,
+                                                   "months": 40}),
+            ("2010 - 2014", {"start": "2010", "end": "2014", "current": False, "months": 60}),
+            ("Sep 2019 – Dec 2019", {"start": "2019-09", "end": "2019-12", "current": False, "months": 4}),
+            ("Feb 2022 to now", {"start": "2022-02", "end": None, "current": True, "months": 53}),
+        ]
+        for text, expected in cases:
+            with self.subTest(text=text):
+                self.assertEqual(parse_date_range(text, TODAY), expected)
+
+    def test_lone_date_is_a_single_period(self):
+        self.assertEqual(parse_date_range("2019", TODAY), {"start": "2019", "end": "2019", "current": False,
+                                                           "months": 12})
+        self.assertEqual(parse_date_range("May 2019", TODAY)["months"], 1)
+
+    def test_unparseable(self):
+        for text in (None, "", "Present"):
+            with self.subTest(text=text):
+                self.assertEqual(parse_date_range(text, TODAY)["months"], None)
+
+
+class NormalizeProfileTest(unittest.TestCase):
+
+    def test_structured_experience_and_education(self):
+        profile = normalize_profile({
+            "name": "Jane Doe",
+            "profileUrl": "https://de.linkedin.com/in/Jane-Doe/?trk=x",
+            "details": {
+                "experience": [
+                    {"title": "VP Sales", "company": "Acme", "duration": "Jan 2020 - Present"},
+                    {"title": "AE", "company": "Globex", "duration": "Mar 2016 - Dec 2019"},
+                ],
+                "education": [{"school": "TU Munich", "dates": "2010 - 2014"}],
+            },
+        }, TODAY)
+        self.assertEqual(profile["profileUrl"], "https://www.linkedin.com/in/jane-doe/")
+        self.assertEqual(profile["key"], "in:jane-doe")
+        self.assertEqual(profile["careerStart"], "2016-03")
+        self.assertEqual(profile["experienceMonths"], 78 + 46)
+        self.assertEqual((profile["currentTitle"], profile["currentCompany"]), ("VP Sales", "Acme"))
+        self.assertEqual(profile["details"]["education"][0]["startYear"], 2010)
+        self.assertEqual(profile["details"]["education"][0]["endYear"], 2014)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,71 @@
+"""
+Profile URL normalisation tests for profile_index.py.
+
+Run with ``python -m unittest discover tests`` (or pytest) from the repo root.
+"""
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from profile_index import canonical_profile_url, profile_key, site_profile_url  # noqa: E402
+
+CANONICAL = "https://www.linkedin.com/in/jane-doe/"
+
+
+class ProfileKeyTest(unittest.TestCase):
+
+    def test_url_variants_share_one_key(self):
+        variants = [
+            "https://www.linkedin.com/in/jane-doe",
+            "https://www.linkedin.com/in/jane-doe/",
+            "https://www.linkedin.com/in/Jane-Doe/?miniProfileUrn=urn%3Ali%3Afs_miniProfile%3AACoAA",
+            "https://de.linkedin.com/in/jane-doe/",
+            "https://www.linkedin.com/in/jane-doe/de/",
+            "https://www.linkedin.com/in/jane-doe/overlay/contact-info/",
+            "http://linkedin.com/in/jane-doe#experience",
+            "linkedin.com/in/jane-doe",
+            "/in/jane-doe/",
+        ]
+        for url in variants:
+            with self.subTest(url=url):
+                self.assertEqual(profile_key(url), "in:jane-doe")
+                self.assertEqual(canonical_profile_url(url), CANONICAL)
+
+    def test_percent_encoded_vanity_names(self):
+        self.assertEqual(profile_key("https://www.linkedin.com/in/j%C3%BCrgen-m%C3%BCller/"), "in:jürgen-müller")
+        self.assertEqual(profile_key("https://www.linkedin.com/in/J%C3%BCrgen-M%C3%BCller"),
+                         profile_key("https://www.linkedin.com/in/jürgen-müller/"))
+        self.assertEqual(canonical_profile_url("https://www.linkedin.com/in/jürgen-müller"),
+                         "https://www.linkedin.com/in/j%C3%BCrgen-m%C3%BCller/")
+
+    def test_opaque_profile_ids_keep_their_case(self):
+        url = "https://www.linkedin.com/in/ACoAAB1cDeFgHiJkLmN/"
+        self.assertEqual(profile_key(url), "urn:ACoAAB1cDeFgHiJkLmN")
+        self.assertNotEqual(profile_key(url), profile_key(url.lower()))
+        self.assertEqual(canonical_profile_url(url + "?trk=abc"), url)
+
+    def test_urns(self):
+        self.assertEqual(profile_key("urn:li:member:123456"), "urn:member:123456")
+        self.assertEqual(profile_key("urn:li:fs_miniProfile:ACoAAB1cDeFgHiJkLmN"), "urn:ACoAAB1cDeFgHiJkLmN")
+        self.assertEqual(profile_key("urn:li:fsd_profile:ACoAAB1cDeFgHiJkLmN"),
+                         profile_key("https://www.linkedin.com/in/ACoAAB1cDeFgHiJkLmN/"))
+        self.assertEqual(profile_key("https://www.linkedin.com/feed/?highlightedUrn=urn%3Ali%3Amember%3A123456"),
+                         "urn:member:123456")
+        # A member URN has no profile URL of its own
+        self.assertEqual(canonical_profile_url("urn:li:member:123456"), "urn:li:member:123456")
+
+    def test_non_profile_values(self):
+        for value in (None, "", "https://www.linkedin.com/company/acme/", "https://www.linkedin.com/in/"):
+            with self.subTest(value=value):
+                self.assertIsNone(profile_key(value))
+
+    def test_site_profile_url_follows_base_url(self):
+        self.assertEqual(site_profile_url("https://de.linkedin.com/in/Jane-Doe/?trk=x", "http://127.0.0.1:8080/"),
+                         "http://127.0.0.1:8080/in/jane-doe/")
+        self.assertEqual(site_profile_url(CANONICAL, "https://www.linkedin.com"), CANONICAL)
+
+
+if __name__ == "__main__":
+    unittest.main()
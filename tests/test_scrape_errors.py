@@ -0,0 +1,109 @@
+"""
+Error classification and circuit breaker tests for scrape_errors.py.
+
+Run with ``python -m unittest discover tests`` (or pytest) from the repo root.
+"""
+import os
+import sys
+import types
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+import scrape_errors  # noqa: E402
+from scrape_errors import CircuitBreaker, CircuitOpenError, ScrapeError, classify, inspect_page  # noqa: E402
+
+
+def page(url="https://www.linkedin.com/feed/", title="Feed | LinkedIn"):
+    return types.SimpleNamespace(current_url=url, title=title)
+
+
+def named_exception(name, message=""):
+    """An exception whose class name matches a Selenium exception, without importing Selenium."""
+    return type(name, (Exception,), {})(message)
+
+
+class ClassifyTest(unittest.TestCase):
+
+    def test_inspect_page(self):
+        self.assertIsNone(inspect_page(page()))
+        self.assertEqual(inspect_page(page("https://www.linkedin.com/checkpoint/challenge/x")), scrape_errors.CHECKPOINT)
+        self.assertEqual(inspect_page(page("https://www.linkedin.com/authwall?trk=x")), scrape_errors.AUTH_LOST)
+        self.assertEqual(inspect_page(page(title="429 Too Many Requests")), scrape_errors.RATE_LIMITED)
+        self.assertIsNone(inspect_page(page(title="Jane 4290 | LinkedIn")))
+
+    def test_exception_names_and_messages(self):
+        cases = [
+            (named_exception("InvalidSessionIdException"), scrape_errors.DRIVER_CRASH),
+            (named_exception("WebDriverException", "chrome not reachable"), scrape_errors.DRIVER_CRASH),
+            (named_exception("TimeoutException"), scrape_errors.TIMEOUT),
+            (TimeoutError(), scrape_errors.TIMEOUT),
+            (named_exception("NoSuchElementException", "no such element"), scrape_errors.STRUCTURE_CHANGED),
+            (RuntimeError("HTTP 429 Too Many Requests"), scrape_errors.RATE_LIMITED),
+            (RuntimeError("status code: 429"), scrape_errors.RATE_LIMITED),
+            (ScrapeError("gone", scrape_errors.CHECKPOINT), scrape_errors.CHECKPOINT),
+            (ValueError("something else"), scrape_errors.UNKNOWN),
+        ]
+        for exc, expected in cases:
+            with self.subTest(exc=exc):
+                self.assertEqual(classify(exc), expected)
+
+    def test_429_inside_addresses_and_urls_is_not_rate_limiting(self):
+        messages = [
+            "Message: unknown error\nStacktrace:\n#0 0x55d4294a1b2c <unknown>\n#1 0x429fe0 <unknown>",
+            "Profile details error: https://www.linkedin.com/in/jane-doe-4291a/",
+            "Element <li data-id='429'> is not clickable",
+        ]
+        for message in messages:
+            with self.subTest(message=message):
+                self.assertEqual(classify(named_exception("WebDriverException", message)), scrape_errors.UNKNOWN)
+
+    def test_driver_page_explains_the_failure(self):
+        driver = page("https://www.linkedin.com/login?session_redirect=x")
+        self.assertEqual(classify(named_exception("NoSuchElementException"), driver), scrape_errors.AUTH_LOST)
+
+
+class CircuitBreakerTest(unittest.TestCase):
+
+    def setUp(self):
+        self.sleeps = []
+        self.breaker = CircuitBreaker(sleep=self.sleeps.append)
+
+    def test_fatal_class_stops_after_its_threshold(self):
+        self.breaker.record_failure(scrape_errors.AUTH_LOST)
+        with self.assertRaises(CircuitOpenError) as caught:
+            self.breaker.before_call()
+        self.assertEqual(caught.exception.error_class, scrape_errors.AUTH_LOST)
+        self.assertEqual(self.breaker.snapshot()["open"], scrape_errors.AUTH_LOST)
+
+    def test_success_resets_consecutive_failures(self):
+        for _ in range(4):
+            self.breaker.record_failure(scrape_errors.UNKNOWN)
+            self.breaker.record_success()
+        self.breaker.before_call()
+        self.assertEqual(self.breaker.snapshot(), {"failures": {scrape_errors.UNKNOWN: 4}, "successes": 4,
+                                                    "open": None, "pauses": 0})
+
+    def test_pausable_class_sleeps_then_allows_one_trial(self):
+        for _ in range(2):
+            self.breaker.record_failure(scrape_errors.RATE_LIMITED)
+        self.breaker.before_call()
+        self.assertEqual(self.sleeps, [300])
+        # Half-open: the next failure of the same class reopens it straight away
+        self.breaker.record_failure(scrape_errors.RATE_LIMITED)
+        self.assertEqual(self.breaker.open_class, scrape_errors.RATE_LIMITED)
+        self.breaker.before_call()
+        self.assertEqual(self.sleeps, [300, 300])
+        self.assertEqual(self.breaker.snapshot()["pauses"], 2)
+
+    def test_overrides_and_unknown_classes(self):
+        breaker = CircuitBreaker({scrape_errors.STRUCTURE_CHANGED: 1}, {scrape_errors.STRUCTURE_CHANGED: 5},
+                                 sleep=self.sleeps.append)
+        self.assertEqual(breaker.record_failure("made_up"), scrape_errors.UNKNOWN)
+        breaker.record_failure(scrape_errors.STRUCTURE_CHANGED)
+        breaker.before_call()
+        self.assertEqual(self.sleeps, [5])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,124 @@
+"""
+Facet mapping tests for search_url.py.
+
+Run with ``python -m unittest discover tests`` (or pytest) from the repo root.
+"""
+import json
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from urllib.parse import parse_qs, urlparse
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from search_url import FacetLookup, build_search_url  # noqa: E402
+
+
+def query(url):
+    return {name: values[0] for name, values in parse_qs(urlparse(url).query).items()}
+
+
+class BuildSearchUrlTest(unittest.TestCase):
+
+    def test_keywords_only(self):
+        url, unapplied = build_search_url("vp sales")
+        self.assertEqual(url, "https://www.linkedin.com/search/results/people/?keywords=vp%20sales"
+                              "&origin=FACETED_SEARCH")
+        self.assertEqual(unapplied, [])
+
+    def test_known_names_become_facets(self):
+        url, unapplied = build_search_url("engineer", {
+            "location": "Germany",
+            "currentCompany": ["Google", "1035"],
+            "industry": "Software Development",
+            "connectionDegree": "1, 2",
+        })
+        params = query(url)
+        self.assertEqual(json.loads(params["geoUrn"]), ["101282230"])
+        self.assertEqual(json.loads(params["currentCompany"]), ["1441", "1035"])
+        self.assertEqual(json.loads(params["industry"]), ["4"])
+        self.assertEqual(json.loads(params["network"]), ["F", "S"])
+        self.assertEqual(unapplied, [])
+
+    def test_unknown_names_fall_back_to_text(self):
+        url, unapplied = build_search_url("", {
+            "location": "Berlin, Germany",
+            "currentCompany": "Acme Robotics",
+            "school": "TU Munich",
+            "connectionDegree": "7",
+            "yearsOfExperience": "5",
+        })
+        params = query(url)
+        # No geo id and no text parameter for locations, so the name joins the keywords
+        self.assertEqual(params["keywords"], "Berlin, Germany")
+        self.assertEqual(params["company"], "Acme Robotics")
+        self.assertEqual(params["school"], "TU Munich")
+        self.assertNotIn("geoUrn", params)
+        self.assertEqual(unapplied, ["connectionDegree", "yearsOfExperience"])
+
+    def test_base_url_and_page(self):
+        url, _ = build_search_url("sales", page=3, base_url="http://127.0.0.1:8080/")
+        self.assertTrue(url.startswith("http://127.0.0.1:8080/search/results/people/?"))
+        self.assertEqual(query(url)["page"], "3")
+
+
+class FacetLookupTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp(prefix="facets_test_")
+        self.path = os.path.join(self.tmp, "facet_urns.json")
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def test_ids_and_urns_pass_through(self):
+        lookup = FacetLookup()
+        self.assertEqual(lookup.resolve("company", "1441"), "1441")
+        self.assertEqual(lookup.resolve("geo", "urn:li:geo:103644278"), "103644278")
+        self.assertEqual(lookup.resolve("geo", "  United   States "), "103644278")
+
+    def test_resolutions_and_misses_are_persisted(self):
+        calls = []
+
+        def resolver(kind, name):
+            calls.append(name)
+            return "999" if name == "Acme" else None
+
+        lookup = FacetLookup(self.path, resolver=resolver)
+        self.assertEqual(lookup.resolve("company", "Acme"), "999")
+        self.assertIsNone(lookup.resolve("company", "Nobody Inc"))
+
+        reloaded = FacetLookup(self.path, resolver=resolver)
+        self.assertEqual(reloaded.resolve("company", "acme"), "999")
+        self.assertIsNone(reloaded.resolve("company", "nobody inc"))
+        self.assertEqual(calls, ["Acme", "Nobody Inc"])
+
+    def test_resolver_errors_are_not_cached(self):
+        def resolver(kind, name):
+            raise RuntimeError("typeahead unavailable")
+
+        lookup = FacetLookup(self.path, resolver=resolver)
+        self.assertIsNone(lookup.resolve("school", "TU Munich"))
+        self.assertFalse(os.path.exists(self.path))
+
+    def test_concurrent_writers_merge_their_entries(self):
+        first = FacetLookup(self.path)
+        second = FacetLookup(self.path)
+        first.remember("company", "Acme", "1")
+        second.remember("company", "Globex", "2")
+        with open(self.path, "r", encoding="utf-8") as f:
+            companies = json.load(f)["company"]
+        self.assertEqual((companies["acme"], companies["globex"]), ("1", "2"))
+        self.assertEqual([name for name in os.listdir(self.tmp) if name.endswith(".tmp")], [])
+
+    def test_persist_failure_keeps_the_entry_in_memory(self):
+        lookup = FacetLookup(os.path.join(self.path, "not-a-dir", "facet_urns.json"))
+        open(self.path, "w").close()
+        lookup.remember("company", "Acme", "1")
+        self.assertEqual(lookup.resolve("company", "Acme"), "1")
+
+
+if __name__ == "__main__":
+    unittest.main()